@@ -0,0 +1,71 @@
+import sys
+import json
+import asyncio
+import argparse
+
+from src.telemetry import setup_logging
+
+# Usage:
+#   python app.py "Tesla's Q3 revenue grew by 5%"          one document, JSON report on stdout
+#   echo "..." | python app.py                             same, text from stdin
+#   python app.py --batch docs.jsonl -o verdicts.jsonl     JSONL in, JSONL verdicts out (resumable)
+#   cat docs.jsonl | python app.py --batch - -o verdicts.jsonl
+
+
+def parse_args(argv=None):
+    from src.batch import DEFAULT_WORKERS, DEFAULT_CHUNK_SIZE, DEFAULT_CONCURRENCY
+    from src.rate_limit import RATE_LIMITS
+
+    parser = argparse.ArgumentParser(description="Verify the factual claims in text.")
+    parser.add_argument("text", nargs="*", help="text to verify (read from stdin if omitted)")
+    parser.add_argument("--batch", metavar="JSONL", help="verify every document in a JSONL file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="verdicts.jsonl", help="batch output (JSONL), also the checkpoint")
+    parser.add_argument("--field", default="text", help="JSON field holding each document's text")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="documents per worker task")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="documents in flight per worker")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of resuming")
+    for provider, rate in RATE_LIMITS.items():
+        parser.add_argument(f"--{provider}-rps", type=float, default=rate,
+                            help=f"{provider} requests per second across all workers (0 = unlimited)")
+    parser.add_argument("--log-level", default=None, help="DEBUG, INFO, WARNING (default: FACT_ENGINE_LOG_LEVEL)")
+    return parser.parse_args(argv)
+
+
+def run_batch_cli(args):
+    from src.batch import read_documents, run_batch
+    from src.rate_limit import RATE_LIMITS
+
+    source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    with source:
+        counts = run_batch(
+            read_documents(source, field=args.field),
+            args.output,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            concurrency=args.concurrency,
+            resume=not args.no_resume,
+            rates={provider: getattr(args, f"{provider}_rps") for provider in RATE_LIMITS},
+            log_level=args.log_level,
+        )
+    print(json.dumps(counts), file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging(args.log_level)
+    if args.batch:
+        return run_batch_cli(args)
+
+    from src.pipeline import verify_document
+
+    user_text = " ".join(args.text) or sys.stdin.read()
+    report = asyncio.run(verify_document(user_text.strip()))
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import sys
+import subprocess
+
+# ==============================================================================
+# IMPORT-TIME BENCHMARK
+# Imports each entry module in a fresh interpreter with `-X importtime` and
+# reports its cumulative import cost. Fails (exit 1) if a module goes over its
+# budget or pulls in a heavy dependency that should only load on first use.
+# Run from the repo root: python benchmarks/import_time.py
+# ==============================================================================
+MODULES = [
+    "src.config",
+    "src.replay",
+    "src.telemetry",
+    "src.rate_limit",
+    "src.resilience",
+    "src.cache",
+    "src.tools.yfinance_tool",
+    "src.agents.planner_agent",
+    "src.agents.temporal_agent",
+    "src.agents.web_agent",
+    "src.agents.db_agent",
+    "src.agents.adjudicator",
+    "src.pipeline",
+]
+
+# These must not be imported until a call actually needs them.
+DEFERRED_PACKAGES = ["openai", "httpx", "tavily", "yfinance", "pandas", "numpy", "dotenv"]
+
+BUDGET_MS = 150
+
+
+def measure(module):
+    """Returns (own cumulative import time in ms, set of top-level packages imported)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    cumulative_us, packages = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if not cumulative.isdigit():
+            continue  # header row
+        packages.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, packages
+
+
+def main():
+    failures = []
+    print(f"{'module':32} {'ms':>8}  heavy imports")
+    for module in MODULES:
+        ms, packages = measure(module)
+        heavy = sorted(set(DEFERRED_PACKAGES) & packages)
+        print(f"{module:32} {ms:8.1f}  {', '.join(heavy) or '-'}")
+        if ms > BUDGET_MS:
+            failures.append(f"{module} took {ms:.1f}ms (budget {BUDGET_MS}ms)")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at import time")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import Counter, defaultdict
+
+# ==============================================================================
+# REPLAY BENCHMARK
+# Runs a fixed corpus through the whole pipeline (decomposition -> DB / web
+# lookup -> adjudication) with every OpenAI, Tavily and yfinance call served
+# from fixtures (src/replay.py) and a simulated network latency per provider.
+# Reports p50/p95 latency per stage, provider calls and tokens per claim, and
+# cache hit rates. Fully offline; each run starts from empty caches.
+# The bundled fixtures are synthetic (see fixtures/SYNTHETIC): token counts and
+# the semantic-index hit rate only become real after a --record run.
+# Run from the repo root:
+#   python benchmarks/replay_pipeline.py                   # replay
+#   python benchmarks/replay_pipeline.py --record          # re-capture fixtures (live APIs)
+#   python benchmarks/replay_pipeline.py --passes 2        # second pass shows warm caches
+# Exits 1 if a call had no fixture.
+# ==============================================================================
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, "corpus.jsonl")
+DEFAULT_FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+DEFAULT_LATENCY = "openai=0.8,tavily=0.4,yfinance=0.12"
+SYNTHETIC_MARKER = "SYNTHETIC"   # present while the fixtures are canned samples, not live recordings
+
+# Pipeline functions timed as stages: stage name -> name in src.pipeline.
+STAGES = {
+    "decompose": "extract_claims_with_time",
+    "db_lookup": "lookup_financial_data",
+    "web_search": "search_web_evidence",
+    "adjudicate": "adjudicate_locally",
+    "semantic": "verify_semantically",
+}
+
+STAGE_TIMES = defaultdict(list)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _timed(stage, func):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            STAGE_TIMES[stage].append(time.perf_counter() - started)
+    return wrapper
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+async def run_corpus(pipeline, texts, concurrency):
+    """Verifies every document, at most `concurrency` at a time, under one set of provider limits."""
+    limits = pipeline.new_provider_limits()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def _one(text):
+        async with gate:
+            started = time.perf_counter()
+            try:
+                return await pipeline.verify_document(text, limits)
+            except Exception as e:
+                print(f"Document failed: {e}")
+                return None
+            finally:
+                STAGE_TIMES["document"].append(time.perf_counter() - started)
+
+    return await asyncio.gather(*(_one(text) for text in texts))
+
+
+def _rate(hits, total):
+    return f"{hits / total:.1%}" if total else "-"
+
+
+def report(results, wall_seconds, stats, synthetic=False):
+    documents = [r for r in results if r]
+    claims = [c for r in documents for c in r["claims"]]
+    per_claim = max(len(claims), 1)
+
+    print(f"\n{'stage':12} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'total s':>9}")
+    for stage in [*STAGES, "document"]:
+        times = STAGE_TIMES.get(stage)
+        if not times:
+            continue
+        print(f"{stage:12} {len(times):6} {percentile(times, 50) * 1000:9.1f} "
+              f"{percentile(times, 95) * 1000:9.1f} {sum(times):9.2f}")
+
+    replay, cache, snapshots, mapper = stats["replay"], stats["cache"], stats["snapshots"], stats["mapper"]
+    print(f"\ndocuments: {len(documents)}/{len(results)}  claims: {len(claims)}  wall: {wall_seconds:.2f}s")
+    print("verdicts: " + ", ".join(f"{k}={v}" for k, v in Counter((c["verdict"] or {}).get("verdict", "ERROR") for c in claims).items()))
+
+    print("\nprovider calls per claim:")
+    for provider in ("openai", "tavily", "yfinance"):
+        print(f"  {provider:10} {replay[provider]:5}  ({replay[provider] / per_claim:.2f}/claim)")
+    tokens = replay["prompt_tokens"] + replay["completion_tokens"]
+    print(f"tokens per claim: {tokens / per_claim:.0f} "
+          f"(prompt {replay['prompt_tokens'] / per_claim:.0f}, completion {replay['completion_tokens'] / per_claim:.0f})")
+
+    adjudication = stats["adjudication"]
+    print("\ncache hit rates:")
+    print(f"  response cache (shared)      {_rate(cache['hits'], cache['hits'] + cache['misses'])}")
+    print(f"  ticker snapshots             {_rate(snapshots['hits'], snapshots['hits'] + snapshots['misses'])}"
+          f"  (+{snapshots['coalesced']} coalesced in flight)")
+    print(f"  attribute mapper (local)     {_rate(mapper['total'] - mapper['llm'], mapper['total'])}")
+    print(f"  adjudicated locally          "
+          f"{_rate(adjudication['rules'], adjudication['rules'] + adjudication['semantic'])}")
+    index = stats["claim_index"]
+    print(f"  claim index                  {_rate(index['hits'], index['hits'] + index['misses'])}"
+          f"  (+{index['coalesced']} coalesced in flight)")
+    semantic = stats["semantic"]
+    print(f"  semantic index (no LLM)      {_rate(semantic['index'], semantic['index'] + semantic['llm'])}"
+          f"  ({semantic['embedded']} text(s) embedded)")
+
+    if synthetic:
+        print("\nnote: synthetic fixtures (see fixtures/SYNTHETIC); tokens and semantic-index hits are not real figures")
+
+    if replay["missing"]:
+        print(f"\nFAIL: {replay['missing']} call(s) had no fixture (re-record with --record)")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a fixed corpus through the pipeline offline.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--latency", default=DEFAULT_LATENCY,
+                        help="simulated seconds per call, e.g. openai=0.8,tavily=0.4,yfinance=0.12")
+    parser.add_argument("--concurrency", type=int, default=4, help="documents in flight at once")
+    parser.add_argument("--passes", type=int, default=1, help="run the corpus this many times in one process")
+    parser.add_argument("--record", action="store_true", help="call the live APIs and (re)write the fixtures")
+    parser.add_argument("--metrics", action="store_true", help="also print the telemetry in Prometheus text format")
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="apply the provider rate limits (off by default: replayed calls cost nothing)")
+    args = parser.parse_args()
+
+    # Fresh caches so every run measures the same cold start.
+    scratch = tempfile.mkdtemp(prefix="fact-engine-bench-")
+    os.environ["FACT_ENGINE_CACHE_PATH"] = os.path.join(scratch, "responses.sqlite")
+    os.environ["FACT_ENGINE_PRICE_STORE"] = os.path.join(scratch, "prices")
+    os.environ["FACT_ENGINE_VECTOR_INDEX"] = os.path.join(scratch, "vectors")
+    sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+    from src import replay, pipeline, cache, telemetry, rate_limit
+    from src.agents.adjudicator import ADJUDICATION_STATS
+    from src.tools.ticker_cache import get_cache_stats as get_snapshot_stats
+    from src.tools.yfinance_tool import get_mapper_stats
+    from src.claim_index import get_index_stats
+    from src.agents.semantic import get_semantic_stats
+
+    replay.set_mode("record" if args.record else "replay", args.fixtures,
+                    latency={} if args.record else replay.parse_latency(args.latency))
+    if not (args.rate_limits or args.record):
+        rate_limit.install({})
+    for stage, name in STAGES.items():
+        setattr(pipeline, name, _timed(stage, getattr(pipeline, name)))
+
+    texts = load_corpus(args.corpus)
+    results = []
+    started = time.perf_counter()
+    for _ in range(args.passes):
+        results += asyncio.run(run_corpus(pipeline, texts, args.concurrency))
+    wall_seconds = time.perf_counter() - started
+
+    stats = {
+        "replay": dict(replay.REPLAY_STATS),
+        "cache": cache.get_cache_stats(),
+        "snapshots": get_snapshot_stats(),
+        "mapper": get_mapper_stats(),
+        "adjudication": dict(ADJUDICATION_STATS),
+        "claim_index": get_index_stats(),
+        "semantic": get_semantic_stats(),
+    }
+    marker = os.path.join(args.fixtures, SYNTHETIC_MARKER)
+    if args.record:
+        print(f"Recorded {stats['replay']['recorded']} fixture(s) to {args.fixtures}")
+        if os.path.exists(marker):
+            os.remove(marker)  # every call of this run now has a live recording
+    if args.metrics:
+        print(telemetry.export_prometheus())
+    return report(results, wall_seconds, stats, synthetic=os.path.exists(marker))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
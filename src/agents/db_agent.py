@@ -1,33 +1,206 @@
-from src.tools.yfinance_tool import fetch_yfinance_data
+import os
+import time
+import logging
+import threading
+import contextvars
+from datetime import date
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from src.tools.yfinance_tool import fetch_yfinance_metric, map_attribute_to_metric_key
+from src.tools.yfinance_tool import SUPPORTED_METRICS as YFINANCE_METRICS
+from src.tools.mock_provider import fetch_mock_data
+from src.tools.mock_provider import SUPPORTED_METRICS as MOCK_METRICS
+from src.telemetry import span, count, setup_logging
+from src.resilience import PermanentError, TransientError
+
+logger = logging.getLogger(__name__)
+
+
+class DataProvider:
+    """
+    One registered data source.
+    `fetch(ticker, metric_key)` returns a result or None; raising or timing out counts
+    as a failure, and `failure_threshold` failures in a row open the circuit for `cooldown` seconds.
+    A PermanentError (the request was wrong, the provider is fine) does not count.
+    """
+
+    def __init__(self, name, fetch, supported_metrics, expected_latency, timeout,
+                 failure_threshold=3, cooldown=60):
+        self.name = name
+        self.fetch = fetch
+        self.supported_metrics = set(supported_metrics)
+        self.expected_latency = expected_latency
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._latencies = deque(maxlen=200)
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def supports(self, metric_key):
+        return metric_key in self.supported_metrics
+
+    def is_available(self):
+        return time.monotonic() >= self._open_until
+
+    def hedge_delay(self):
+        """p95 of observed latencies, or the declared latency until there is enough history."""
+        with self._lock:
+            if len(self._latencies) < 20:
+                return self.expected_latency
+            ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def record_success(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.cooldown
+                self._consecutive_failures = 0
+                count("db.circuit_opened", provider=self.name)
+                logger.warning("DB Agent: Circuit open for %s (%ss cool-down)", self.name, self.cooldown)
+
 
 # ==============================================================================
 # THE REGISTRY
-# Register all your provider functions here.
+# Register all your providers here.
+# Each one declares the metric keys it can answer and how fast it usually is.
 # ==============================================================================
 DATA_PROVIDERS = [
-    fetch_yfinance_data,
-    # fetch_bloomberg_data,  <-- Easy to add later
+    DataProvider("yfinance", fetch_yfinance_metric, YFINANCE_METRICS, expected_latency=0.8, timeout=10),
+    # DataProvider("bloomberg", fetch_bloomberg_metric, [...], ...),  <-- Easy to add later
 ]
 
-def lookup_financial_data(ticker, attribute):
+# Offline runs (demos, benchmarks) swap in the local mock provider.
+if os.getenv("FACT_ENGINE_MOCK_PROVIDER") == "1":
+    DATA_PROVIDERS.insert(
+        0, DataProvider("mock", fetch_mock_data, MOCK_METRICS, expected_latency=0.05, timeout=1)
+    )
+
+# "hedge": start the fastest provider, add a backup after its p95 latency.
+# "race":  start every capable provider at once.
+LOOKUP_STRATEGY = "hedge"
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="db-agent")
+
+
+def _launch(provider, ticker, metric_key):
+    # Run in a copy of the caller's context so its request deadline applies in the pool thread.
+    context = contextvars.copy_context()
+    return _EXECUTOR.submit(context.run, provider.fetch, ticker, metric_key), time.monotonic()
+
+
+def _first_good_answer(providers, ticker, metric_key, strategy):
+    waiting = list(providers)
+    in_flight = {}
+    next_launch = time.monotonic()
+    transient = None
+
+    while waiting or in_flight:
+        now = time.monotonic()
+
+        # Start the next provider when the hedge delay elapses, or straight away
+        # if nothing is in flight (the previous one failed or came back empty).
+        while waiting and (strategy == "race" or not in_flight or now >= next_launch):
+            provider = waiting.pop(0)
+            future, started = _launch(provider, ticker, metric_key)
+            count("db.provider_calls", provider=provider.name)
+            in_flight[future] = (provider, started)
+            next_launch = now + provider.hedge_delay()
+
+        deadlines = [started + provider.timeout for provider, started in in_flight.values()]
+        wake_at = min(deadlines + ([next_launch] if waiting else []))
+        done, _ = wait(in_flight, timeout=max(0.0, wake_at - time.monotonic()), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            provider, started = in_flight.pop(future)
+            try:
+                result = future.result()
+            except PermanentError as e:
+                logger.info("DB Agent: %s cannot answer: %s", provider.name, e)
+                continue
+            except Exception as e:
+                count("db.provider_failures", provider=provider.name)
+                logger.warning("DB Agent: %s failed: %s", provider.name, e)
+                provider.record_failure()
+                transient = e if isinstance(e, TransientError) else TransientError(provider.name, e, 1)
+                continue
+
+            provider.record_success(time.monotonic() - started)
+            if result:
+                logger.debug("Found via %s", provider.name)
+                return result
+
+        now = time.monotonic()
+        for future, (provider, started) in list(in_flight.items()):
+            if now - started >= provider.timeout:
+                count("db.provider_timeouts", provider=provider.name)
+                logger.warning("DB Agent: %s timed out after %ss", provider.name, provider.timeout)
+                provider.record_failure()
+                future.cancel()
+                del in_flight[future]
+                transient = TransientError(provider.name, TimeoutError(f"no answer in {provider.timeout}s"), 1)
+
+    # No provider had the data. If one of them could not be asked, say so rather than "not found".
+    if transient is not None:
+        raise transient
+    return None
+
+
+def _attribute_with_timeframe(attribute, timeframe):
+    """Adds a resolved past timeframe ('2023-03') so "stock price" maps to historical_price."""
+    if not timeframe or not timeframe[:4].isdigit():
+        return attribute
+    if timeframe[:7] >= date.today().isoformat()[:7] or timeframe[:4] in attribute:
+        return attribute
+    return f"{attribute} in {timeframe}"
+
+
+def resolve_metric_key(attribute, timeframe=None):
+    """The metric key for a claim's attribute, using its timeframe when the planner supplied one."""
+    return map_attribute_to_metric_key(_attribute_with_timeframe(attribute, timeframe))
+
+
+def lookup_financial_data(ticker, attribute, timeframe=None, strategy=None):
     """
     Main Entry Point.
-    Iterates through all connected providers to find the data.
+    Resolves the metric once (using the claim's timeframe when the planner supplied one),
+    then races/hedges only the providers that support it and whose circuit is closed.
+    Returns the first non-empty answer, None if no provider has the data, and raises
+    TransientError if none had it but at least one failed or timed out.
     """
-    print(f"    DB Agent: Looking up '{attribute}' for {ticker}...")
-    
-    for provider in DATA_PROVIDERS:
-        result = provider(ticker, attribute)
-        
-        if result:
-            print(f"  Found via {provider.__name__}")
-            return result
-            
-    print("    Data not found in any connected DB provider.")
-    return None
+    logger.info("DB Agent: Looking up '%s' for %s", attribute, ticker)
+
+    metric_key = resolve_metric_key(attribute, timeframe)
+    if metric_key == "unknown":
+        logger.info("Attribute '%s' does not map to any known metric.", attribute)
+        return None
+
+    capable = sorted(
+        (p for p in DATA_PROVIDERS if p.supports(metric_key) and p.is_available()),
+        key=lambda p: p.hedge_delay(),
+    )
+    if not capable:
+        logger.info("No available provider supports '%s'.", metric_key)
+        return None
+
+    with span("db.lookup", metric=metric_key):
+        result = _first_good_answer(capable, ticker, metric_key, strategy or LOOKUP_STRATEGY)
+    if result is None:
+        logger.info("Data not found in any connected DB provider.")
+    return result
 
 
 if __name__ == "__main__":
+    setup_logging()
     print("\n--- TEST SUITE: DB AGENT ---")
 
     # Test 1: Simple Price (The "Hello World" of finance)
@@ -45,7 +218,21 @@ if __name__ == "__main__":
     # Test 4: Ambiguous/Synonym (The "Smart Mapping")
     print("\n4. Testing Synonyms (Profitability):")
     print(lookup_financial_data("GOOGL", "Are they profitable?"))
-    
+
     # Test 5: Bad Ticker (The "Safety Check")
     print("\n5. Testing Error Handling:")
-    print(lookup_financial_data("FAKE_CO", "price"))
\ No newline at end of file
+    print(lookup_financial_data("FAKE_CO", "price"))
+
+    # Test 6: Hedging & Circuit Breaker (offline, mock providers only)
+    print("\n6. Testing Hedging (offline):")
+
+    def flaky(ticker, metric_key):
+        raise ConnectionError("provider down")
+
+    DATA_PROVIDERS[:] = [
+        DataProvider("flaky", flaky, MOCK_METRICS, expected_latency=0.01, timeout=1, failure_threshold=2, cooldown=5),
+        DataProvider("mock", fetch_mock_data, MOCK_METRICS, expected_latency=0.05, timeout=1),
+    ]
+    for _ in range(3):
+        print(lookup_financial_data("AAPL", "market cap"))
+    print(f"flaky available: {DATA_PROVIDERS[0].is_available()}")
@@ -1,79 +1,380 @@
-import os
+import re
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
+import logging
+from src.config import get_openai_client
+from src.telemetry import span, setup_logging
+from src.resilience import call_provider, classify, ProviderError, PERMANENT
+from src.cache import cached_call, cache_get, cache_set, make_key
+from src.agents.temporal_agent import (
+    TIME_TYPES, TIME_ANCHOR_SCHEMA, CONSISTENCY_SCHEMA, TEMPORAL_TTL, today_string, temporal_system_prompt
+)
+
+logger = logging.getLogger(__name__)
+
+# We ask for the 'ticker' specifically to help the DB Agent later.
+CLAIM_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "target": {
+            "type": "string", 
+            "description": "The subject entity (e.g., 'Tesla', 'US GDP')"
+        },
+        "ticker": {
+            "type": "string",
+            "description": "The stock ticker if public (e.g. 'TSLA'). Set to null if private."
+        },
+        "attribute": {
+            "type": "string", 
+            "description": "The specific property being claimed (e.g., 'Q3 Revenue', 'CEO', 'Stock Price')"
+        },
+        "claimed_value": {
+            "type": "string", 
+            "description": "The value stated in the text (e.g., '+5%', 'Elon Musk', '$150')"
+        }
+    },
+    "required": ["target", "ticker", "attribute", "claimed_value"]
+}
+
+PLANNER_MODEL = "gpt-4o-mini"
+CLAIMS_CACHE_NAMESPACE = "planner.claims"       # batch decomposition entries
+PLANNER_SYSTEM_PROMPT = "You are The Fact Decomposer. Isolate verifiable units of information. Always extract the Stock Ticker for public companies so we can check the database."
+
+
+# ==============================================================================
+# COMBINED EXTRACTION
+# One call returns the atomic claims with their resolved timeframes attached,
+# plus the temporal analysis. decompose_user_query and the temporal agent's
+# analyze_temporal_context are views over it.
+# ==============================================================================
+TIMED_CLAIM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **CLAIM_ITEM_SCHEMA["properties"],
+        "time_type": {
+            "type": "string",
+            "enum": TIME_TYPES
+        },
+        "inferred_timeframe": {
+            "type": "string",
+            "description": "When the claim applies, resolved against today's date: 'YYYY', 'YYYY-MM', 'YYYY-MM-DD' or 'YYYY-Qn'. Use 'current' if no time is stated."
+        }
+    },
+    "required": CLAIM_ITEM_SCHEMA["required"] + ["time_type", "inferred_timeframe"]
+}
+
+COMBINED_EXTRACTION_SCHEMA = [
+    {
+        "type": "function",
+        "function": {
+            "name": "extract_claims_and_time",
+            "description": "Breaks text into atomic, verifiable claims with their timeframes, and extracts the temporal logic of the whole text.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "claims": {
+                        "type": "array",
+                        "items": TIMED_CLAIM_SCHEMA
+                    },
+                    "time_anchors": {
+                        "type": "array",
+                        "items": TIME_ANCHOR_SCHEMA
+                    },
+                    "consistency_check": CONSISTENCY_SCHEMA,
+                    "explanation": {"type": "string"}
+                },
+                "required": ["claims", "time_anchors", "consistency_check", "explanation"]
+            }
+        }
+    }
+]
+
+# The planner writes "null" (or similar) rather than omitting the ticker of a private company.
+_NO_TICKER = ("null", "none", "n/a")
+
+
+def has_ticker(claim):
+    """True if the claim names a real ticker, not a placeholder for "no ticker"."""
+    ticker = claim.get("ticker")
+    return bool(ticker) and str(ticker).strip().lower() not in _NO_TICKER
+
+
+def extract_claims_with_time(user_text):
+    """
+    Role: The Fact Decomposer + Temporal Agent in one call
+    Input: Unstructured text (e.g., "the stock was at $220 in March 2023")
+    Output: {claims (each with time_type / inferred_timeframe), time_anchors, consistency_check, explanation}
+    """
+    logger.info("Planner (Decomposer + Temporal) is analyzing: '%s'", user_text)
+
+    today_str = today_string()
+    system_prompt = (
+        f"{PLANNER_SYSTEM_PROMPT} {temporal_system_prompt(today_str)} "
+        "Attach to every claim the timeframe it refers to."
+    )
+
+    def _call_llm():
+        with span("openai.chat", agent="planner", model=PLANNER_MODEL) as s:
+            response = call_provider(
+                "openai", get_openai_client().chat.completions.create, span=s,
+                model=PLANNER_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_text}
+                ],
+                tools=COMBINED_EXTRACTION_SCHEMA,
+                tool_choice={"type": "function", "function": {"name": "extract_claims_and_time"}}
+            )
+            s.usage(response)
+
+        tool_call = response.choices[0].message.tool_calls[0]
+        return json.loads(tool_call.function.arguments)
+
+    # Relative dates resolve against today, so today's date is part of the key.
+    key_parts = {"model": PLANNER_MODEL, "today": today_str, "prompt": system_prompt,
+                 "schema": COMBINED_EXTRACTION_SCHEMA, "input": user_text}
+    return cached_call("planner.claims_with_time", key_parts, _call_llm, ttl=TEMPORAL_TTL)
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def decompose_user_query(user_text):
     """
     Role: The Fact Decomposer (Planner)
     Input: Unstructured text (e.g., "Google's revenue is up 5%")
-    Output: A list of Atomic Claims (Target, Ticker, Attribute, Value)
+    Output: A list of Atomic Claims (Target, Ticker, Attribute, Value, plus their timeframe)
     """
-    
-    # We ask for the 'ticker' specifically to help the DB Agent later.
-    extraction_schema = [
-        {
-            "type": "function",
-            "function": {
-                "name": "extract_atomic_claims",
-                "description": "Breaks complex text into isolated, verifiable atomic claims. Extracts tickers for public companies.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "claims": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "target": {
-                                        "type": "string", 
-                                        "description": "The subject entity (e.g., 'Tesla', 'US GDP')"
-                                    },
-                                    "ticker": {
-                                        "type": "string",
-                                        "description": "The stock ticker if public (e.g. 'TSLA'). Set to null if private."
-                                    },
-                                    "attribute": {
-                                        "type": "string", 
-                                        "description": "The specific property being claimed (e.g., 'Q3 Revenue', 'CEO', 'Stock Price')"
-                                    },
-                                    "claimed_value": {
-                                        "type": "string", 
-                                        "description": "The value stated in the text (e.g., '+5%', 'Elon Musk', '$150')"
-                                    }
+    return extract_claims_with_time(user_text)["claims"]
+
+
+# ==============================================================================
+# BATCH DECOMPOSITION
+# Many short documents share one tool call. Each document carries a stable id,
+# claims stream back per document as the arguments arrive, and only documents
+# whose output failed to parse are sent again. Claims come back in the same
+# timed shape as extract_claims_with_time, so the fallback for documents that
+# never parse returns the same fields.
+# ==============================================================================
+BATCH_EXTRACTION_SCHEMA = [
+    {
+        "type": "function",
+        "function": {
+            "name": "extract_atomic_claims_batch",
+            "description": "Breaks every document into isolated, verifiable atomic claims. Returns one entry per document id.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "documents": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "doc_id": {
+                                    "type": "string",
+                                    "description": "The id attribute of the <document> tag, copied exactly."
                                 },
-                                "required": ["target", "ticker", "attribute", "claimed_value"]
-                            }
+                                "claims": {
+                                    "type": "array",
+                                    "items": TIMED_CLAIM_SCHEMA
+                                }
+                            },
+                            "required": ["doc_id", "claims"]
                         }
-                    },
-                    "required": ["claims"]
-                }
+                    }
+                },
+                "required": ["documents"]
             }
         }
-    ]
+    }
+]
 
-    print(f"\n🧠 Planner (Decomposer) is analyzing: '{user_text}'...")
+BATCH_INSTRUCTIONS = (
+    "The input holds several documents, each wrapped in <document id=\"...\">. "
+    "Decompose each document independently and return exactly one entry per document id, "
+    "in input order. Use an empty claims list if a document has no verifiable claims. "
+    "Attach to every claim the timeframe it refers to."
+)
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are The Fact Decomposer. Isolate verifiable units of information. Always extract the Stock Ticker for public companies so we can check the database."},
-            {"role": "user", "content": user_text}
-        ],
-        tools=extraction_schema,
-        tool_choice={"type": "function", "function": {"name": "extract_atomic_claims"}}
-    )
+MAX_BATCH_TOKENS = 6000       # prompt budget per request (rough: 4 characters per token)
+MAX_BATCH_DOCUMENTS = 50
+MAX_BATCH_RETRIES = 2
 
-    tool_call = response.choices[0].message.tool_calls[0]
-    parsed_args = json.loads(tool_call.function.arguments)
-    
-    return parsed_args['claims']
+BATCH_STATS = {"cache_hits": 0, "llm_calls": 0, "documents": 0, "claims": 0, "retried_documents": 0, "fallback_calls": 0}
+
+_REQUIRED_CLAIM_FIELDS = TIMED_CLAIM_SCHEMA["required"]
+
+
+def batch_system_prompt(today_str):
+    return f"{PLANNER_SYSTEM_PROMPT} {temporal_system_prompt(today_str)} {BATCH_INSTRUCTIONS}"
+
+
+def _claims_cache_parts(user_text, today_str):
+    # Relative dates resolve against today, so today's date is part of the key.
+    return {"model": PLANNER_MODEL, "today": today_str, "prompt": batch_system_prompt(today_str),
+            "schema": BATCH_EXTRACTION_SCHEMA, "input": user_text}
+
+
+def _estimate_tokens(text):
+    return len(text) // 4 + 10
+
+
+def _pack_batches(documents):
+    """Splits (doc_id, text) pairs into batches that fit the token and size budgets."""
+    batch, budget = [], 0
+    for doc_id, text in documents:
+        cost = _estimate_tokens(text)
+        if batch and (budget + cost > MAX_BATCH_TOKENS or len(batch) >= MAX_BATCH_DOCUMENTS):
+            yield batch
+            batch, budget = [], 0
+        batch.append((doc_id, text))
+        budget += cost
+    if batch:
+        yield batch
+
+
+def _format_batch(batch):
+    return "\n\n".join(f'<document id="{doc_id}">\n{text}\n</document>' for doc_id, text in batch)
+
+
+def _stream_tool_arguments(stream, s):
+    for chunk in stream:
+        s.usage(chunk)  # only the final chunk carries usage
+        if not chunk.choices:
+            continue
+        for tool_call in chunk.choices[0].delta.tool_calls or []:
+            if tool_call.function and tool_call.function.arguments:
+                yield tool_call.function.arguments
+
+
+def _iter_streamed_documents(fragments):
+    """
+    Incrementally decodes the `documents` array of a streamed tool call,
+    yielding each document object as soon as its closing brace arrives.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = "", None
+
+    for fragment in fragments:
+        buffer += fragment
+        if position is None:
+            opening = re.search(r'"documents"\s*:\s*\[', buffer)
+            if not opening:
+                continue
+            position = opening.end()
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position >= len(buffer) or buffer[position] == "]":
+                break
+            try:
+                document, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # Incomplete object; wait for the next fragment.
+            yield document
+
+
+def _valid_claims(document):
+    claims = document.get("claims") if isinstance(document, dict) else None
+    if not isinstance(claims, list):
+        return None
+    for claim in claims:
+        if not isinstance(claim, dict) or any(field not in claim for field in _REQUIRED_CLAIM_FIELDS):
+            return None
+    return claims
+
+
+def _decompose_one_batch(batch, system_prompt):
+    """Yields (doc_id, claims) for every document in `batch` that parsed cleanly."""
+    BATCH_STATS["llm_calls"] += 1
+    with span("openai.chat", agent="planner_batch", model=PLANNER_MODEL) as s:
+        # Only opening the stream is retried; a stream cut off midway leaves its
+        # unparsed documents to the retry loop in decompose_batch.
+        stream = call_provider(
+            "openai", get_openai_client().chat.completions.create, span=s,
+            model=PLANNER_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": _format_batch(batch)}
+            ],
+            tools=BATCH_EXTRACTION_SCHEMA,
+            tool_choice={"type": "function", "function": {"name": "extract_atomic_claims_batch"}},
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+
+        pending = {doc_id for doc_id, _ in batch}
+        for document in _iter_streamed_documents(_stream_tool_arguments(stream, s)):
+            doc_id = str(document.get("doc_id")) if isinstance(document, dict) else None
+            claims = _valid_claims(document)
+            if doc_id in pending and claims is not None:
+                pending.discard(doc_id)
+                yield doc_id, claims
+
+
+def decompose_batch(documents):
+    """
+    Role: The Fact Decomposer (Planner), batch mode
+    Input: A list of texts (ids become their index as a string) or a {doc_id: text} dict
+    Output: A generator of (doc_id, claims) pairs, yielded as each document parses. Claims
+            carry time_type / inferred_timeframe, as from extract_claims_with_time.
+            Documents that still fail after MAX_BATCH_RETRIES fall back to decompose_user_query.
+    """
+    if isinstance(documents, dict):
+        queue = [(str(doc_id), text) for doc_id, text in documents.items()]
+    else:
+        queue = [(str(index), text) for index, text in enumerate(documents)]
+
+    logger.info("Planner (Batch) is analyzing %d documents", len(queue))
+    BATCH_STATS["documents"] += len(queue)
+    today_str = today_string()
+    system_prompt = batch_system_prompt(today_str)
+
+    uncached = []
+    for doc_id, text in queue:
+        claims = cache_get(make_key(CLAIMS_CACHE_NAMESPACE, **_claims_cache_parts(text, today_str)))
+        if claims is None:
+            uncached.append((doc_id, text))
+        else:
+            BATCH_STATS["cache_hits"] += 1
+            yield doc_id, claims
+    queue = uncached
+    texts = dict(queue)
+
+    for attempt in range(MAX_BATCH_RETRIES + 1):
+        if not queue:
+            return
+        failed = []
+        for batch in _pack_batches(queue):
+            done = set()
+            try:
+                for doc_id, claims in _decompose_one_batch(batch, system_prompt):
+                    done.add(doc_id)
+                    cache_set(make_key(CLAIMS_CACHE_NAMESPACE, **_claims_cache_parts(texts[doc_id], today_str)),
+                              claims, TEMPORAL_TTL, CLAIMS_CACHE_NAMESPACE)
+                    BATCH_STATS["claims"] += len(claims)
+                    yield doc_id, claims
+            except json.JSONDecodeError:
+                pass
+            except ProviderError:
+                raise
+            except Exception as e:
+                if classify(e) == PERMANENT:
+                    raise
+                logger.warning("Planner (Batch): stream broke off (%s); retrying its remaining documents", e)
+            failed.extend((doc_id, text) for doc_id, text in batch if doc_id not in done)
+
+        if not failed:
+            return
+        BATCH_STATS["retried_documents"] += len(failed)
+        queue = failed
+
+    for doc_id, text in queue:
+        BATCH_STATS["fallback_calls"] += 1
+        claims = decompose_user_query(text)
+        BATCH_STATS["claims"] += len(claims)
+        yield doc_id, claims
 
 # --- TEST ---
 if __name__ == "__main__":
+    setup_logging()
 
     # Test 1: A standard public company claim (Should get Ticker: GOOGL)
     text1 = "Google's Q4 revenue for 2025 was $100 Billion and the stock was at $220 in March 2023"
@@ -87,6 +388,7 @@ if __name__ == "__main__":
         print(f"  Ticker:    {claim['ticker']}  <-- DB Agent Enabled")
         print(f"  Attribute: {claim['attribute']}")
         print(f"  Value:     {claim['claimed_value']}")
+        print(f"  Timeframe: {claim.get('inferred_timeframe')} ({claim.get('time_type')})")
         print("-" * 30)
 
     # Test 2: A private company claim (Should get Ticker: None)
@@ -100,4 +402,15 @@ if __name__ == "__main__":
         print(f"  Ticker:    {claim['ticker']}  <-- DB Agent Disabled (only have yfinance API)")
         print(f"  Attribute: {claim['attribute']}")
         print(f"  Value:     {claim['claimed_value']}")
-        print("-" * 30)
\ No newline at end of file
+        print("-" * 30)
+
+    # Test 3: Batch mode (one streamed call for many documents)
+    feed = [
+        "Tesla's Q3 revenue grew by 5%.",
+        "Apple's market cap passed $3 trillion.",
+        "Nvidia pays a dividend.",
+    ]
+    print("\n--- TEST 3: Batch Decomposition ---")
+    for doc_id, claims in decompose_batch(feed):
+        print(f"Doc {doc_id}: {claims}")
+    print(BATCH_STATS)
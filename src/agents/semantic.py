@@ -0,0 +1,242 @@
+import json
+import logging
+from src.cache import cached_call, SEARCH_TTL
+from src.config import get_openai_client
+from src.telemetry import span, count
+from src.resilience import call_provider, ProviderError
+from src.agents.web_agent import format_web_evidence
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# SEMANTIC VERIFIER
+# Claims and web snippets are embedded (one batched call per verification,
+# only for texts not embedded before) into a local vector index. A claim is
+# first matched against previously verified claims: a near-identical one about
+# the same entity, value and period hands over its verdict. A numeric claim
+# without DB evidence is also supported by a near-identical snippet stating
+# the same number, unit, direction and period; claims with DB evidence are
+# never settled by web text here (DB outranks web). Only what the index cannot
+# settle goes to the LLM, whose decisive verdicts are added to the index.
+# ==============================================================================
+SEMANTIC_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH = 64          # texts per embeddings request
+
+CLAIM_MATCH_THRESHOLD = 0.85  # cosine similarity for "the same claim, reworded"
+SNIPPET_THRESHOLD = 0.85      # a snippet this close that states the claimed number supports it
+NEIGHBOURS = 5
+
+SNIPPET_TTL = SEARCH_TTL
+
+SEMANTIC_STATS = {"index": 0, "llm": 0, "embedded": 0}
+
+SEMANTIC_SYSTEM_PROMPT = (
+    "You are The Semantic Verifier. Judge whether the claim is supported by the evidence. "
+    "Check logical consistency, terminology alignment and causal plausibility. "
+    "Structured DB evidence outranks web text for numbers; web text outranks your own knowledge for news. "
+    "Answer INCONCLUSIVE when the evidence does not address the claim."
+)
+
+VERDICT_SCHEMA = [
+    {
+        "type": "function",
+        "function": {
+            "name": "report_verdict",
+            "description": "Reports whether the evidence supports the atomic claim.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "verdict": {"type": "string", "enum": ["SUPPORTED", "REFUTED", "INCONCLUSIVE"]},
+                    "confidence": {"type": "number", "description": "0.0 to 1.0"},
+                    "reason": {"type": "string"}
+                },
+                "required": ["verdict", "confidence", "reason"]
+            }
+        }
+    }
+]
+
+
+def claim_text(claim):
+    """The sentence embedded for a claim, e.g. "Tesla (TSLA) Q3 Revenue: $25 billion [2025-Q3]"."""
+    ticker = f" ({claim['ticker']})" if claim.get("ticker") else ""
+    timeframe = f" [{claim['inferred_timeframe']}]" if claim.get("inferred_timeframe") else ""
+    return f"{claim.get('target')}{ticker} {claim.get('attribute')}: {claim.get('claimed_value')}{timeframe}"
+
+
+def _index():
+    from src.tools.vector_index import get_vector_index  # deferred: numpy is only needed here
+    return get_vector_index(EMBEDDING_MODEL)
+
+
+def embed_texts(texts):
+    """
+    Unit vectors for `texts` (a list, in order). Texts already in the index reuse
+    their stored vector; the rest are embedded in batches of EMBEDDING_BATCH.
+    """
+    from src.tools.vector_index import text_key, normalize
+
+    known = _index().vectors([text_key(text) for text in texts])
+    vectors = {text: known[text_key(text)] for text in texts if text_key(text) in known}
+    missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+
+    for start in range(0, len(missing), EMBEDDING_BATCH):
+        batch = missing[start:start + EMBEDDING_BATCH]
+        with span("openai.embeddings", model=EMBEDDING_MODEL) as s:
+            response = call_provider("openai", get_openai_client().embeddings.create, span=s,
+                                     model=EMBEDDING_MODEL, input=batch)
+            s.usage(response)
+        for item in sorted(response.data, key=lambda d: d.index):
+            vectors[batch[item.index]] = normalize(item.embedding)
+        SEMANTIC_STATS["embedded"] += len(batch)
+    return [vectors[text] for text in texts]
+
+
+def _snippets(web_evidence):
+    if not isinstance(web_evidence, dict):
+        return []
+    return [r for r in web_evidence.get("results", []) if r.get("snippet")]
+
+
+def _same_metric(known, canonical):
+    """Resolved metric keys must agree; free-text attributes (unresolved) are left to the embedding."""
+    from src.tools.yfinance_tool import METRIC_KEYS
+
+    if known in METRIC_KEYS and canonical in METRIC_KEYS:
+        return known == canonical
+    return True
+
+
+def _from_known_claims(canonical, hits):
+    """The verdict of a near-identical verified claim about the same entity, metric, value and period."""
+    for score, entry in hits:
+        if score < CLAIM_MATCH_THRESHOLD:
+            break
+        known = entry["canonical"]
+        if (known["entity"], known["value"], known["timeframe"]) == \
+                (canonical["entity"], canonical["value"], canonical["timeframe"]) and \
+                _same_metric(known["metric"], canonical["metric"]):
+            return {
+                "verdict": entry["verdict"],
+                "confidence": round(min(entry["confidence"], score), 2),
+                "reason": f"Matches a verified claim ({score:.2f}): {entry['text']}",
+            }
+    return None
+
+
+def _from_snippets(claimed, timeframe, hits):
+    """SUPPORTED when a closely matching snippet states the claimed number for the claimed period."""
+    from src.agents.adjudicator import states_value
+
+    for score, entry in hits:
+        if score < SNIPPET_THRESHOLD:
+            break
+        if states_value(entry["text"], claimed, timeframe):
+            return {
+                "verdict": "SUPPORTED",
+                "confidence": round(min(0.85, score), 2),
+                "reason": f"A matching source ({score:.2f}) states the claimed value: {entry['text'][:200]} "
+                          f"<{entry.get('url')}>",
+            }
+    return None
+
+
+def check_against_index(claim, web_evidence, db_evidence=None):
+    """
+    Nearest-neighbour verdict from the local index, or None when it is inconclusive.
+    Snippets only decide claims without DB evidence.
+    Returns (verdict or None, claim vector) so a later LLM verdict can be indexed without re-embedding.
+    """
+    from src.agents.adjudicator import parse_claimed_value, parse_timeframe
+    from src.claim_index import canonical_claim
+
+    snippets = _snippets(web_evidence)
+    text = claim_text(claim)
+    vectors = embed_texts([text] + [r["snippet"] for r in snippets])
+    claim_vector = vectors[0]
+    _index().add([(r["snippet"], "snippet", SNIPPET_TTL, vector, {"url": r.get("url"), "score": r.get("score")})
+                  for r, vector in zip(snippets, vectors[1:])])
+
+    canonical = canonical_claim(claim)
+    verdict = _from_known_claims(canonical, _index().search(claim_vector, "claim", NEIGHBOURS))
+    claimed = parse_claimed_value(claim.get("claimed_value"))
+    if verdict is None and claimed is not None and not db_evidence:
+        timeframe = parse_timeframe(claim.get("inferred_timeframe") or claim.get("attribute"))
+        verdict = _from_snippets(claimed, timeframe, _index().search(claim_vector, "snippet", NEIGHBOURS))
+    return verdict, claim_vector, canonical
+
+
+def remember_verdict(claim, canonical, verdict, vector):
+    """Adds a decisive verdict to the index so rewordings of the claim are settled locally."""
+    from src.claim_index import freshness
+
+    if verdict.get("verdict") not in ("SUPPORTED", "REFUTED"):
+        return
+    _index().add([(claim_text(claim), "claim", freshness(canonical), vector,
+                   {"canonical": canonical, "verdict": verdict["verdict"],
+                    "confidence": verdict.get("confidence") or 0.0})])
+
+
+def _verify_with_llm(claim, db_evidence, web_evidence):
+    if isinstance(web_evidence, dict):
+        web_evidence = format_web_evidence(web_evidence)
+
+    evidence_text = (
+        f"CLAIM: {json.dumps(claim)}\n"
+        f"DB EVIDENCE: {db_evidence if db_evidence else 'None'}\n"
+        f"WEB EVIDENCE: {web_evidence if web_evidence else 'None'}"
+    )
+
+    def _call_llm():
+        with span("openai.chat", agent="semantic", model=SEMANTIC_MODEL) as s:
+            response = call_provider(
+                "openai", get_openai_client().chat.completions.create, span=s,
+                model=SEMANTIC_MODEL,
+                messages=[
+                    {"role": "system", "content": SEMANTIC_SYSTEM_PROMPT},
+                    {"role": "user", "content": evidence_text}
+                ],
+                tools=VERDICT_SCHEMA,
+                tool_choice={"type": "function", "function": {"name": "report_verdict"}},
+                temperature=0
+            )
+            s.usage(response)
+        tool_call = response.choices[0].message.tool_calls[0]
+        return json.loads(tool_call.function.arguments)
+
+    key_parts = {"model": SEMANTIC_MODEL, "prompt": SEMANTIC_SYSTEM_PROMPT, "schema": VERDICT_SCHEMA, "input": evidence_text}
+    return cached_call("semantic.verdict", key_parts, _call_llm)
+
+
+def verify_semantically(claim, db_evidence, web_evidence):
+    """
+    Role: The Semantic Verifier (LLM Query Agent)
+    Input: An atomic claim plus the DB and web evidence gathered for it
+    Output: A verdict dict (verdict, confidence, reason, method: "embedding" | "llm")
+    """
+    logger.info("Semantic Verifier checking: '%s = %s'", claim.get('attribute'), claim.get('claimed_value'))
+
+    try:
+        verdict, vector, canonical = check_against_index(claim, web_evidence, db_evidence)
+    except ProviderError as e:
+        # The index only saves time; without embeddings the LLM still decides.
+        logger.warning("Semantic index unavailable, asking the LLM: %s", e)
+        verdict = vector = None
+
+    if verdict is not None:
+        SEMANTIC_STATS["index"] += 1
+        count("semantic.decided", method="embedding")
+        return {**verdict, "method": "embedding"}
+
+    SEMANTIC_STATS["llm"] += 1
+    count("semantic.decided", method="llm")
+    verdict = _verify_with_llm(claim, db_evidence, web_evidence)
+    if vector is not None:
+        remember_verdict(claim, canonical, verdict, vector)
+    return {**verdict, "method": "llm"}
+
+
+def get_semantic_stats():
+    decided = SEMANTIC_STATS["index"] + SEMANTIC_STATS["llm"]
+    return {**SEMANTIC_STATS, "index_ratio": round(SEMANTIC_STATS["index"] / decided, 3) if decided else 0.0}
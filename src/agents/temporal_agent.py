@@ -1,79 +1,72 @@
-import os
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
+import logging
 from datetime import datetime
+from src.telemetry import setup_logging
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
+
+TEMPORAL_TTL = 24 * 60 * 60
+
+TIME_TYPES = ["explicit_date", "implicit_era", "relative_time", "timeless"]
+
+TIME_ANCHOR_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "entity_or_concept": {"type": "string"},
+        "time_type": {
+            "type": "string",
+            "enum": TIME_TYPES
+        },
+        "inferred_timeframe": {
+            "type": "string", 
+            "description": "The calculated year/date. E.g. If today is 2026 and user says 'last year', return '2025'."
+        },
+        "reasoning": {"type": "string"}
+    },
+    "required": ["entity_or_concept", "time_type", "inferred_timeframe"]
+}
+
+CONSISTENCY_SCHEMA = {
+    "type": "string",
+    "enum": ["Consistent", "Conflict/Anachronism Detected", "Timeless"]
+}
 
-def analyze_temporal_context(user_text):
 
-    today_str = datetime.now().strftime("%Y-%m-%d")
+def today_string():
+    return datetime.now().strftime("%Y-%m-%d")
 
-    system_prompt = (
+
+def temporal_system_prompt(today_str):
+    return (
         "You are a Temporal Reasoning Engine. "
         f"CRITICAL CONTEXT: Today's date is {today_str}. "
         "All relative dates (like 'last year', 'recent', 'next month') MUST be calculated relative to this date."
     )
 
-    temporal_schema = [
-        {
-            "type": "function",
-            "function": {
-                "name": "extract_temporal_logic",
-                "description": "Extracts explicit dates, infers implicit eras, and resolves relative time.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "time_anchors": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "entity_or_concept": {"type": "string"},
-                                    "time_type": {
-                                        "type": "string",
-                                        "enum": ["explicit_date", "implicit_era", "relative_time", "timeless"]
-                                    },
-                                    "inferred_timeframe": {
-                                        "type": "string", 
-                                        "description": "The calculated year/date. E.g. If today is 2026 and user says 'last year', return '2025'."
-                                    },
-                                    "reasoning": {"type": "string"}
-                                },
-                                "required": ["entity_or_concept", "time_type", "inferred_timeframe"]
-                            }
-                        },
-                        "consistency_check": {
-                            "type": "string",
-                            "enum": ["Consistent", "Conflict/Anachronism Detected", "Timeless"]
-                        },
-                        "explanation": {"type": "string"}
-                    },
-                    "required": ["time_anchors", "consistency_check", "explanation"]
-                }
-            }
-        }
-    ]
-
-    print(f"\n⏳ Temporal Agent Analyzing: '{user_text}'...")
-
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_text}
-        ],
-        tools=temporal_schema,
-        tool_choice={"type": "function", "function": {"name": "extract_temporal_logic"}}
-    )
 
-    tool_call = response.choices[0].message.tool_calls[0]
-    return json.loads(tool_call.function.arguments)
+def analyze_temporal_context(user_text):
+    """
+    Role: The Temporal Agent
+    Input: Unstructured text
+    Output: {time_anchors, consistency_check, explanation}
+    A view over the planner's combined extraction, so a document that is also
+    decomposed costs one LLM call in total.
+    """
+    # Imported here: the planner imports this module's schema at load time.
+    from src.agents.planner_agent import extract_claims_with_time
+
+    logger.info("Temporal Agent analyzing: '%s'", user_text)
+
+    extraction = extract_claims_with_time(user_text)
+    return {
+        "time_anchors": extraction["time_anchors"],
+        "consistency_check": extraction["consistency_check"],
+        "explanation": extraction["explanation"],
+    }
 
 # --- TEST ---
 if __name__ == "__main__":
+    setup_logging()
     
     # 1. Implicit Tech Context
     query1 = "Write a Python script using pandas to analyze the Titanic dataset."
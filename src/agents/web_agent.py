@@ -1,34 +1,188 @@
-import os
-from dotenv import load_dotenv
-from tavily import TavilyClient
+import re
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.cache import cached_call, SEARCH_TTL
+from src.config import get_tavily_client
+from src.telemetry import span, setup_logging
+from src.resilience import call_provider, PermanentError
+from src.agents.planner_agent import has_ticker
 
+logger = logging.getLogger(__name__)
 
-load_dotenv()
+# ==============================================================================
+# WEB EVIDENCE
+# Tavily results come back ranked by score with their URL and date. Each
+# snippet is trimmed to the sentences most relevant to the query so the whole
+# evidence set fits a token budget.
+# ==============================================================================
+WEB_TOKEN_BUDGET = 600        # snippet tokens per search (rough: 4 characters per token)
+MAX_SNIPPET_TOKENS = 200
+MIN_RESULT_SCORE = 0.3
+HIGH_SCORE = 0.7              # a result this relevant counts towards "enough evidence"
+ENOUGH_HIGH_SCORE_RESULTS = 3
+MAX_RESULTS = 5
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_STOPWORDS = {"the", "a", "an", "of", "for", "in", "on", "is", "was", "what", "and", "to", "by", "with", "its"}
+
+
+def _estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def _terms(text):
+    return {t for t in re.findall(r"[a-z0-9$%.]+", text.lower()) if t not in _STOPWORDS}
+
+
+def _search(query):
+    def _call_tavily():
+        with span("tavily.search") as s:
+            response = call_provider("tavily", get_tavily_client().search, span=s, query=query,
+                                     search_depth="basic", include_answer=True, max_results=MAX_RESULTS)
+            s.payload(response)
+        return response
+
+    return cached_call(
+        "tavily.search",
+        {"query": query, "search_depth": "basic", "include_answer": True, "max_results": MAX_RESULTS},
+        _call_tavily,
+        ttl=SEARCH_TTL,
+    )
+
+
+def _trim_snippet(content, query_terms, max_tokens):
+    """Keeps the sentences sharing the most terms with the query, in their original order."""
+    sentences = [s for s in _SENTENCE_SPLIT.split(content or "") if s.strip()]
+    ranked = sorted(range(len(sentences)), key=lambda i: -len(_terms(sentences[i]) & query_terms))
+
+    chosen, used = [], 0
+    for index in ranked:
+        cost = _estimate_tokens(sentences[index])
+        if used + cost > max_tokens:
+            if not chosen:
+                # Even the best sentence is too long: cut it to fit.
+                chosen.append(index)
+                sentences[index] = sentences[index][: max_tokens * 4]
+            break
+        chosen.append(index)
+        used += cost
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def search_web_evidence(query, token_budget=WEB_TOKEN_BUDGET, min_score=MIN_RESULT_SCORE):
+    """
+    Input: A question (str)
+    Output: {"query", "answer", "results": [{title, url, score, published_date, snippet}]},
+            results ranked by score and trimmed to `token_budget` in total.
+    """
+    logger.info("Searching the web for: '%s'", query)
+    response = _search(query)
+
+    query_terms = _terms(query)
+    ranked = sorted(response.get("results", []), key=lambda r: r.get("score") or 0, reverse=True)
+
+    results, remaining = [], token_budget
+    for r in ranked:
+        if (r.get("score") or 0) < min_score or remaining <= 0:
+            break
+        snippet = _trim_snippet(r.get("content"), query_terms, min(MAX_SNIPPET_TOKENS, remaining))
+        remaining -= _estimate_tokens(snippet)
+        results.append({
+            "title": r.get("title"),
+            "url": r.get("url"),
+            "score": r.get("score"),
+            "published_date": r.get("published_date"),
+            "snippet": snippet,
+        })
+
+    return {"query": query, "answer": response.get("answer"), "results": results}
+
+
+def format_web_evidence(evidence):
+    """Compact text view of search_web_evidence output for prompts and logs."""
+    if not evidence:
+        return None
+    lines = [f"Answer: {evidence['answer']}"] if evidence.get("answer") else []
+    for i, r in enumerate(evidence["results"], 1):
+        dated = f", {r['published_date']}" if r.get("published_date") else ""
+        lines.append(f"[{i}] ({r['score']:.2f}{dated}) {r['snippet']} <{r['url']}>")
+    return "\n".join(lines)
 
-tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
 def lookup_web_data(query):
     """
     Input: A question (str)
-    Output: A summary answer from the web (str)
+    Output: A summary answer from the web (str), or None if Tavily rejects the query.
+            Raises TransientError when Tavily stays unreachable through the retries.
     """
-    print(f"Searching the web for: '{query}'...")
-    
     try:
-        response = tavily.search(query=query, search_depth="basic", include_answer=True)
-        
-        context = "\n".join([r['content'] for r in response['results']])
-
-        return context
-        
-    except Exception as e:
-        print(f"Web Search failed for query {query} : {e}")
+        return format_web_evidence(search_web_evidence(query))
+
+    except PermanentError as e:
+        logger.warning("Web Search rejected query %s : %s", query, e)
         return None
 
+
+def stream_web_evidence(queries, max_workers=4, enough=ENOUGH_HIGH_SCORE_RESULTS, high_score=HIGH_SCORE):
+    """
+    Runs the searches concurrently and yields each evidence dict as it arrives.
+    Stops early (cancelling searches not yet started) once `enough` results scoring
+    at least `high_score` have been yielded.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    # Each search runs in a copy of the caller's context, so its request deadline applies.
+    futures = [pool.submit(contextvars.copy_context().run, search_web_evidence, query)
+               for query in dict.fromkeys(queries)]
+    strong = 0
+    try:
+        for future in as_completed(futures):
+            try:
+                evidence = future.result()
+            except Exception as e:
+                logger.warning("Web Search failed: %s", e)
+                continue
+            yield evidence
+            strong += sum(1 for r in evidence["results"] if (r["score"] or 0) >= high_score)
+            if strong >= enough:
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_claim_queries(claims):
+    """
+    One search per entity instead of one per claim.
+    Returns {query: [indexes of the claims it covers]}.
+    """
+    groups = {}
+    for index, claim in enumerate(claims):
+        entity = (claim["ticker"] if has_ticker(claim) else claim.get("target") or "").strip().upper()
+        group = groups.setdefault(entity, {"target": claim.get("target") or entity, "attributes": [], "claims": []})
+        attribute = (claim.get("attribute") or "").strip()
+        if attribute and attribute.lower() not in (a.lower() for a in group["attributes"]):
+            group["attributes"].append(attribute)
+        group["claims"].append(index)
+
+    return {f"{g['target']} {', '.join(g['attributes'])}".strip(): g["claims"] for g in groups.values()}
+
+
 # --- TEST ---
 if __name__ == "__main__":
+    setup_logging()
     print("--- Test 1 (Private Company) ---")
     print(lookup_web_data("What is OpenAI's estimated revenue?"))
-    
+
     print("\n--- Test 2 (News) ---")
     print(lookup_web_data("Why is Tesla stock moving today?"))
+
+    print("\n--- Test 3 (Shared Queries + Streaming) ---")
+    claims = [
+        {"target": "Tesla", "ticker": "TSLA", "attribute": "Q3 Revenue", "claimed_value": "+5%"},
+        {"target": "Tesla", "ticker": "TSLA", "attribute": "CEO", "claimed_value": "Elon Musk"},
+        {"target": "OpenAI", "ticker": None, "attribute": "Revenue", "claimed_value": "$1 billion"},
+    ]
+    queries = build_claim_queries(claims)
+    print(queries)
+    for evidence in stream_web_evidence(queries):
+        print(format_web_evidence(evidence))
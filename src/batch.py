@@ -0,0 +1,203 @@
+import os
+import json
+import asyncio
+import logging
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src import rate_limit
+from src.telemetry import setup_logging
+from src.resilience import describe_error, TRANSIENT
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# BATCH VERIFICATION
+# Documents are read from JSONL and handed out in chunks to a pool of worker
+# processes. Each worker runs the async pipeline over its chunk, so the CPU
+# side (parsing, canonicalisation, adjudication) spreads over processes while
+# API calls overlap inside each one. Verdicts are appended to the output JSONL
+# as chunks finish; the output doubles as the checkpoint, so a resumed run
+# skips every document already written and retries the ones that failed. The
+# last record per id wins, and a resumed run that retried anything rewrites
+# the output without the superseded error records. Paid calls for
+# half-finished documents are not repeated either: their LLM and search
+# responses are in the shared on-disk cache. All workers draw from the same
+# shared rate-limit buckets.
+# ==============================================================================
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_CHUNK_SIZE = 4
+DEFAULT_CONCURRENCY = 8       # documents in flight per worker
+
+ID_FIELDS = ("id", "doc_id", "request_id")
+
+
+def read_documents(lines, field="text"):
+    """
+    Yields (doc_id, text) from JSONL lines. A line is an object with `field`
+    (and optionally an id) or a bare JSON string. Ids default to the line number.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Skipping line %d: not valid JSON", number)
+            continue
+        if isinstance(record, str):
+            yield str(number), record
+            continue
+        text = record.get(field)
+        if not text:
+            logger.warning("Skipping line %d: no '%s' field", number, field)
+            continue
+        doc_id = next((record[k] for k in ID_FIELDS if record.get(k) is not None), number)
+        yield str(doc_id), text
+
+
+def _latest_status(output_path):
+    """
+    {id: True if its last record in `output_path` has no error}. A partial last
+    line (the run died mid-write) is cut off so appending starts on a clean line.
+    """
+    if not os.path.exists(output_path):
+        return {}
+
+    status, good_bytes = {}, 0
+    with open(output_path, "rb") as f:
+        for raw in f:
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                break
+            good_bytes += len(raw)
+            status[str(record["id"])] = "error" not in record
+
+    if good_bytes < os.path.getsize(output_path):
+        logger.warning("Truncating a partial line at the end of %s", output_path)
+        with open(output_path, "r+b") as f:
+            f.truncate(good_bytes)
+    return status
+
+
+def completed_ids(output_path):
+    """Ids whose last record in `output_path` succeeded (last record per id wins)."""
+    return {doc_id for doc_id, ok in _latest_status(output_path).items() if ok}
+
+
+def compact_output(output_path):
+    """Rewrites `output_path` with only the last record of each id, in the order they were written."""
+    latest = {}
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            doc_id = str(json.loads(line)["id"])
+            latest.pop(doc_id, None)
+            latest[doc_id] = line
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(latest.values())
+    os.replace(tmp_path, output_path)
+
+
+def _jsonable(value):
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+# --- worker side ---
+
+def _init_worker(buckets, log_level):
+    from src.config import reset_clients
+
+    reset_clients()  # never share a parent's HTTP connections
+    rate_limit.install(buckets)
+    setup_logging(log_level)
+
+
+async def _verify_chunk_async(chunk, concurrency):
+    from src.pipeline import verify_document, new_provider_limits
+
+    limits = new_provider_limits()
+    gate = asyncio.Semaphore(concurrency)
+
+    async def _one(doc_id, text):
+        async with gate:
+            try:
+                report = await verify_document(text, limits)
+            except Exception as e:
+                outcome = describe_error(e)
+                logger.warning("Document %s failed (%s): %s", doc_id, outcome["kind"], e)
+                return {"id": doc_id, "error": outcome["message"], "error_kind": outcome["kind"]}
+            return {"id": doc_id, **report}
+
+    return await asyncio.gather(*(_one(doc_id, text) for doc_id, text in chunk))
+
+
+def _verify_chunk(chunk, concurrency):
+    """Runs in a worker process. Returns (error kind or None, JSON line) per document."""
+    records = asyncio.run(_verify_chunk_async(chunk, concurrency))
+    return [(record.get("error_kind"), json.dumps(record, default=_jsonable)) for record in records]
+
+
+# --- coordinator side ---
+
+def _chunks(documents, size):
+    documents = iter(documents)
+    while chunk := list(islice(documents, size)):
+        yield chunk
+
+
+def run_batch(documents, output_path, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE,
+              concurrency=DEFAULT_CONCURRENCY, resume=True, rates=None, log_level=None):
+    """
+    Verifies (doc_id, text) pairs into `output_path` (JSONL, appended as results arrive).
+    With resume=True, documents already in the output are skipped; failed ones are retried
+    and their old error records dropped, so the output holds one record per id.
+    Returns {"written", "failed", "retryable", "skipped"} for this run: "retryable" counts the
+    failures that were transient (outage, throttling, deadline), so a later resume may succeed.
+    """
+    status = _latest_status(output_path) if resume else {}
+    done = {doc_id for doc_id, ok in status.items() if ok}
+    retrying = len(status) > len(done)
+    counts = {"written": 0, "failed": 0, "retryable": 0, "skipped": 0}
+
+    def _pending():
+        for doc_id, text in documents:
+            if doc_id in done:
+                counts["skipped"] += 1
+                continue
+            yield doc_id, text
+
+    buckets = rate_limit.create_shared_buckets(rates)
+    chunks = _chunks(_pending(), chunk_size)
+    max_in_flight = workers * 2     # enough queued work without reading all input up front
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(buckets, log_level)) as pool:
+        in_flight = set()
+        for chunk in chunks:
+            in_flight.add(pool.submit(_verify_chunk, chunk, concurrency))
+            if len(in_flight) >= max_in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                _write(finished, out, counts)
+        while in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _write(finished, out, counts)
+
+    if retrying:
+        compact_output(output_path)
+    return counts
+
+
+def _write(futures, out, counts):
+    for future in futures:
+        for error_kind, line in future.result():
+            out.write(line + "\n")
+            counts["failed" if error_kind else "written"] += 1
+            if error_kind == TRANSIENT:
+                counts["retryable"] += 1
+        out.flush()
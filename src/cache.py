@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from src.telemetry import count
+
+# ==============================================================================
+# RESPONSE CACHE
+# Content-addressed on-disk cache shared by every LLM and search call.
+# Keys hash (namespace, schema version, model, prompt, schema, input). SQLite in
+# WAL mode lets several worker processes read and write the same file.
+# ==============================================================================
+CACHE_PATH = os.getenv("FACT_ENGINE_CACHE_PATH", os.path.join(".cache", "responses.sqlite"))
+CACHE_ENABLED = os.getenv("FACT_ENGINE_CACHE", "1") != "0"
+CACHE_MAX_ENTRIES = int(os.getenv("FACT_ENGINE_CACHE_MAX_ENTRIES", "200000"))
+
+# Bump to invalidate every entry written by an older layout of the cached values.
+CACHE_SCHEMA_VERSION = 1
+
+LLM_TTL = 30 * 24 * 60 * 60
+SEARCH_TTL = 6 * 60 * 60
+
+CACHE_STATS = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+_EVICT_EVERY = 500          # writes between LRU size checks
+_local = threading.local()
+_writes_since_evict = 0
+
+
+def make_key(namespace, **parts):
+    """Stable hash of everything that can change the response."""
+    payload = json.dumps(
+        {"namespace": namespace, "version": CACHE_SCHEMA_VERSION, **parts},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connection():
+    # sqlite3 connections can't cross threads or forks, so keep one per (thread, pid).
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+
+    directory = os.path.dirname(CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(CACHE_PATH, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " key TEXT PRIMARY KEY, namespace TEXT, value TEXT,"
+        " version INTEGER, expires REAL, accessed REAL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+
+def cache_get(key, default=None):
+    if not CACHE_ENABLED:
+        return default
+    try:
+        conn = _connection()
+        row = conn.execute("SELECT value, version, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or row[1] != CACHE_SCHEMA_VERSION or row[2] < now:
+            if row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            CACHE_STATS["misses"] += 1
+            return default
+
+        conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        CACHE_STATS["hits"] += 1
+        return json.loads(row[0])
+    except sqlite3.Error:
+        CACHE_STATS["errors"] += 1
+        return default
+
+
+def cache_set(key, value, ttl, namespace=""):
+    global _writes_since_evict
+    if not CACHE_ENABLED:
+        return
+    try:
+        now = time.time()
+        _connection().execute(
+            "INSERT OR REPLACE INTO entries (key, namespace, value, version, expires, accessed)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, namespace, json.dumps(value, default=str), CACHE_SCHEMA_VERSION, now + ttl, now),
+        )
+        CACHE_STATS["writes"] += 1
+        _writes_since_evict += 1
+        if _writes_since_evict >= _EVICT_EVERY:
+            _writes_since_evict = 0
+            evict()
+    except sqlite3.Error:
+        CACHE_STATS["errors"] += 1
+
+
+def cached_call(namespace, key_parts, func, ttl=LLM_TTL):
+    """
+    Returns the cached value for (namespace, key_parts), or calls func() and stores it.
+    None results are not cached so failures are retried next time.
+    """
+    key = make_key(namespace, **key_parts)
+    value = cache_get(key)
+    if value is not None:
+        count("cache.hits", namespace=namespace)
+        return value
+
+    count("cache.misses", namespace=namespace)
+    value = func()
+    if value is not None:
+        cache_set(key, value, ttl, namespace)
+    return value
+
+
+def evict(max_entries=None):
+    """Drops expired and stale-version entries, then the least recently used beyond max_entries."""
+    max_entries = CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    try:
+        conn = _connection()
+        conn.execute("DELETE FROM entries WHERE expires < ? OR version != ?", (time.time(), CACHE_SCHEMA_VERSION))
+        (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > max_entries:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count - max_entries,),
+            )
+            CACHE_STATS["evictions"] += count - max_entries
+    except sqlite3.Error:
+        CACHE_STATS["errors"] += 1
+
+
+def get_cache_stats():
+    lookups = CACHE_STATS["hits"] + CACHE_STATS["misses"]
+    return {**CACHE_STATS, "hit_rate": round(CACHE_STATS["hits"] / lookups, 3) if lookups else 0.0}
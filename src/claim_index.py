@@ -0,0 +1,168 @@
+import re
+import asyncio
+import weakref
+from datetime import date
+
+from src.cache import cache_get, cache_set, make_key
+from src.telemetry import count
+from src.agents.adjudicator import parse_claimed_value, parse_timeframe
+from src.agents.db_agent import resolve_metric_key
+from src.agents.planner_agent import has_ticker
+
+# ==============================================================================
+# CANONICAL CLAIM INDEX
+# The same claim arrives in many documents with different wording. Each planner
+# claim is reduced to a canonical form (entity, metric key, parsed value,
+# resolved timeframe) and its verdict is stored under that form in the shared
+# response cache, for as long as the verdict can be trusted. Identical claims
+# being verified at the same moment share one in-flight job.
+# ==============================================================================
+INDEX_NAMESPACE = "claims.verdict"
+
+# How long a verdict stays valid: claims about a closed past period barely
+# change, claims about "now" follow the market.
+CURRENT_FRESHNESS = 15 * 60
+PAST_FRESHNESS = 7 * 24 * 60 * 60
+
+INDEX_STATS = {"hits": 0, "misses": 0, "coalesced": 0, "stored": 0}
+
+_NON_WORD = re.compile(r"[^a-z0-9%$.]+")
+_QUARTER_END_MONTH = {1: 3, 2: 6, 3: 9, 4: 12}
+
+# One table of in-flight jobs per event loop.
+_IN_FLIGHT = weakref.WeakKeyDictionary()
+
+
+def _normalize_text(text):
+    return _NON_WORD.sub(" ", str(text or "").lower()).strip()
+
+
+def _round_significant(value, digits=4):
+    return float(f"{value:.{digits}g}")
+
+
+def _canonical_value(claimed_value):
+    parsed = parse_claimed_value(claimed_value)
+    if parsed is None:
+        return {"text": _normalize_text(claimed_value)}
+    return {
+        "value": _round_significant(parsed["value"]),
+        "unit": parsed["unit"],
+        "is_change": parsed["is_change"],
+        "bound": parsed["bound"],
+    }
+
+
+def _canonical_timeframe(claim):
+    """'2025-Q3', '2023-03', '2024' or 'current'. Falls back to the attribute and value text."""
+    for text in (claim.get("inferred_timeframe"), claim.get("attribute"), claim.get("claimed_value")):
+        timeframe = parse_timeframe(text)
+        if timeframe:
+            break
+    else:
+        return "current"
+
+    if not timeframe["quarter"] and claim.get("attribute"):
+        # "2025" + "Q3 Revenue" -> 2025-Q3
+        timeframe["quarter"] = parse_timeframe(f"{timeframe['year']} {claim['attribute']}")["quarter"]
+
+    if timeframe["quarter"]:
+        return f"{timeframe['year']}-Q{timeframe['quarter']}"
+    if timeframe["month"]:
+        return f"{timeframe['year']}-{timeframe['month']:02d}"
+    return str(timeframe["year"])
+
+
+def _is_past(timeframe, today=None):
+    """True if the whole period ended before today."""
+    if timeframe == "current":
+        return False
+    today = today or date.today()
+    year = int(timeframe[:4])
+    if year != today.year:
+        return year < today.year
+    if "-Q" in timeframe:
+        return _QUARTER_END_MONTH[int(timeframe[-1])] < today.month
+    if len(timeframe) == 7:
+        return int(timeframe[5:]) < today.month
+    return False
+
+
+def canonical_claim(claim):
+    """
+    Input: A planner claim (target, ticker, attribute, claimed_value, inferred_timeframe)
+    Output: {entity, metric, value, timeframe}, identical for rewordings of the same claim
+    """
+    timeframe = _canonical_timeframe(claim)
+    if has_ticker(claim):
+        entity = str(claim["ticker"]).strip().upper()
+        metric = resolve_metric_key(claim.get("attribute") or "", claim.get("inferred_timeframe"))
+    else:
+        entity = _normalize_text(claim.get("target"))
+        metric = "unknown"
+    if metric == "unknown":
+        metric = _normalize_text(claim.get("attribute"))
+
+    return {"entity": entity, "metric": metric, "value": _canonical_value(claim.get("claimed_value")),
+            "timeframe": timeframe}
+
+
+def claim_key(canonical):
+    return make_key(INDEX_NAMESPACE, **canonical)
+
+
+def freshness(canonical):
+    return PAST_FRESHNESS if _is_past(canonical["timeframe"]) else CURRENT_FRESHNESS
+
+
+def lookup_verdict(key):
+    """The indexed verdict for a claim key, or None."""
+    entry = cache_get(key)
+    if entry is None:
+        INDEX_STATS["misses"] += 1
+        count("claim_index.misses")
+        return None
+    INDEX_STATS["hits"] += 1
+    count("claim_index.hits")
+    return entry
+
+
+def store_verdict(key, canonical, verdict):
+    cache_set(key, {"canonical": canonical, "verdict": verdict, "verified_at": date.today().isoformat()},
+              freshness(canonical), INDEX_NAMESPACE)
+    INDEX_STATS["stored"] += 1
+
+
+async def run_once(key, make_job):
+    """
+    Awaits make_job() unless the same key is already running on this event loop,
+    in which case the running job's result (or error) is shared.
+    """
+    in_flight = _IN_FLIGHT.setdefault(asyncio.get_running_loop(), {})
+    running = in_flight.get(key)
+    if running is not None:
+        INDEX_STATS["coalesced"] += 1
+        count("claim_index.coalesced")
+        return await asyncio.shield(running)
+
+    future = asyncio.get_running_loop().create_future()
+    in_flight[key] = future
+    try:
+        result = await make_job()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # retrieved here, so an unshared failure is not reported twice
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        in_flight.pop(key, None)
+
+
+def get_index_stats():
+    lookups = INDEX_STATS["hits"] + INDEX_STATS["misses"]
+    return {**INDEX_STATS, "hit_rate": round(INDEX_STATS["hits"] / lookups, 3) if lookups else 0.0}
@@ -0,0 +1,87 @@
+import os
+import threading
+from src.replay import replayable_client
+
+# ==============================================================================
+# CONFIG & CLIENT REGISTRY
+# Nothing here runs at import time. The .env file is read on first use, and
+# each provider gets one shared client with a pooled, keep-alive HTTP connection,
+# built the first time it is asked for. In record/replay mode (src/replay.py)
+# the client is wrapped so its calls go through fixtures.
+# ==============================================================================
+HTTP_MAX_CONNECTIONS = int(os.getenv("FACT_ENGINE_HTTP_MAX_CONNECTIONS", "32"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("FACT_ENGINE_HTTP_MAX_KEEPALIVE", "16"))
+HTTP_TIMEOUT = float(os.getenv("FACT_ENGINE_HTTP_TIMEOUT", "60"))
+
+_clients = {}
+_lock = threading.RLock()
+_env_loaded = False
+
+
+def load_env():
+    """Reads .env once per process."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+def get_setting(name, default=None):
+    load_env()
+    return os.getenv(name, default)
+
+
+def _get_or_create(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def _create_openai_client():
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+        timeout=HTTP_TIMEOUT,
+    )
+    # Retries are done by src/resilience.py, which also knows the rate limits and deadlines.
+    return OpenAI(api_key=get_setting("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+
+
+def _create_tavily_client():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from tavily import TavilyClient
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_MAX_CONNECTIONS)
+    session.mount("https://", adapter)
+    try:
+        return TavilyClient(api_key=get_setting("TAVILY_API_KEY"), session=session)
+    except TypeError:
+        # Older tavily-python releases have no `session` argument.
+        return TavilyClient(api_key=get_setting("TAVILY_API_KEY"))
+
+
+def get_openai_client():
+    """The one OpenAI client shared by the planner, temporal, mapper and semantic agents."""
+    return _get_or_create("openai", lambda: replayable_client("openai", _create_openai_client))
+
+
+def get_tavily_client():
+    return _get_or_create("tavily", lambda: replayable_client("tavily", _create_tavily_client))
+
+
+def reset_clients():
+    """Drops cached clients (e.g. after fork, or to pick up new settings)."""
+    with _lock:
+        _clients.clear()
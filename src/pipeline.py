@@ -0,0 +1,172 @@
+import os
+import time
+import asyncio
+
+from src.agents.planner_agent import extract_claims_with_time, has_ticker
+from src.agents.db_agent import lookup_financial_data
+from src.agents.web_agent import search_web_evidence, build_claim_queries
+from src.agents.adjudicator import adjudicate_locally, ADJUDICATION_STATS
+from src.agents.semantic import verify_semantically
+from src.telemetry import span, count, setup_logging
+from src.claim_index import canonical_claim, claim_key, lookup_verdict, store_verdict, run_once
+from src.resilience import deadline, describe_error
+
+# ==============================================================================
+# CONCURRENCY LIMITS
+# Every agent is a blocking client call, so each one runs in a worker thread.
+# These caps bound how many calls can be in flight against each provider.
+# ==============================================================================
+PROVIDER_CONCURRENCY = {
+    "openai": 8,
+    "tavily": 4,
+    "yfinance": 8,
+}
+
+
+# Time budget for one document, retries included. Every provider call made for
+# the document (in any worker thread) gives up once it is spent.
+DOCUMENT_DEADLINE = float(os.getenv("FACT_ENGINE_DOCUMENT_DEADLINE", "120"))
+
+
+def new_provider_limits():
+    """One semaphore per provider. Share the dict across documents to bound them together."""
+    return {provider: asyncio.Semaphore(limit) for provider, limit in PROVIDER_CONCURRENCY.items()}
+
+
+async def _run_blocking(limits, provider, func, *args):
+    async with limits[provider]:
+        return await asyncio.to_thread(func, *args)
+
+
+def _web_query(claim):
+    return f"{claim['target']} {claim['attribute']} {claim['claimed_value']}"
+
+
+async def verify_claim(claim, limits, web_search=None):
+    """
+    Gathers DB and web evidence for one atomic claim concurrently, then adjudicates it.
+    `web_search` is a task shared by every claim about the same entity; without one the
+    claim runs its own search. A failing source is reported under 'errors' as
+    {kind: transient|permanent, provider, message} instead of failing the document.
+    """
+    if web_search is None:
+        web_search = _run_blocking(limits, "tavily", search_web_evidence, _web_query(claim))
+    sources = {"web_evidence": web_search}
+    if has_ticker(claim):
+        sources["db_evidence"] = _run_blocking(
+            limits, "yfinance", lookup_financial_data, claim["ticker"], claim["attribute"],
+            claim.get("inferred_timeframe")
+        )
+
+    results = await asyncio.gather(*sources.values(), return_exceptions=True)
+
+    evidence = {"claim": claim, "db_evidence": None, "web_evidence": None, "errors": {}}
+    for name, result in zip(sources, results):
+        if isinstance(result, Exception):
+            evidence["errors"][name] = describe_error(result)
+        else:
+            evidence[name] = result
+
+    # Numeric claims are usually settled by the local rules; the LLM only sees the rest.
+    with span("pipeline.adjudicate"):
+        verdict = adjudicate_locally(claim, evidence["db_evidence"], claim.get("inferred_timeframe"))
+    if verdict is None:
+        ADJUDICATION_STATS["semantic"] += 1
+        try:
+            verdict = await _run_blocking(limits, "openai", verify_semantically,
+                                          claim, evidence["db_evidence"], evidence["web_evidence"])
+        except Exception as e:
+            evidence["errors"]["verdict"] = describe_error(e)
+    evidence["verdict"] = verdict
+    if verdict:
+        count("pipeline.verdicts", verdict=verdict.get("verdict"), method=verdict.get("method"))
+    return evidence
+
+
+def _index_claims(claims):
+    """Canonical form, index key and indexed entry (or None) for each claim."""
+    canonical = [canonical_claim(claim) for claim in claims]
+    keys = [claim_key(form) for form in canonical]
+    return canonical, keys, [lookup_verdict(key) for key in keys]
+
+
+async def _verify_and_index(claim, canonical, key, limits, web_search):
+    evidence = await verify_claim(claim, limits, web_search)
+    evidence["canonical"] = canonical
+    # Verdicts reached with a failing source are not reused.
+    if evidence["verdict"] and not evidence["errors"]:
+        await asyncio.to_thread(store_verdict, key, canonical, evidence["verdict"])
+    return evidence
+
+
+def _from_index(claim, canonical, entry):
+    return {"claim": claim, "canonical": canonical, "db_evidence": None, "web_evidence": None,
+            "errors": {}, "verdict": entry["verdict"], "indexed_at": entry["verified_at"]}
+
+
+async def verify_document(user_text, limits=None, time_budget=DOCUMENT_DEADLINE):
+    """
+    Role: The Orchestrator
+    Extracts claims and their timeframes in one LLM call, then verifies every
+    atomic claim against DB and web sources concurrently. Claims already in the
+    canonical claim index are answered from it, and identical claims in flight
+    at the same time are verified once. Every call made for the document shares
+    one deadline, `time_budget` seconds from now (None: no deadline).
+    """
+    with deadline(time_budget):
+        return await _verify_document(user_text, limits or new_provider_limits())
+
+
+async def _verify_document(user_text, limits):
+    started = time.perf_counter()
+
+    with span("pipeline.decompose"):
+        # The same document arriving twice at once is decomposed once.
+        extraction = await run_once(("extract", user_text), lambda: _run_blocking(
+            limits, "openai", extract_claims_with_time, user_text))
+    claims = extraction["claims"]
+    count("pipeline.claims", len(claims))
+
+    canonical, keys, indexed = await asyncio.to_thread(_index_claims, claims)
+
+    # One search per entity, shared by all of its claims, started by the first claim that needs it.
+    query_of, searches = {}, {}
+    for query, indexes in build_claim_queries(claims).items():
+        query_of.update({index: query for index in indexes})
+
+    def web_search_for(index):
+        query = query_of[index]
+        if query not in searches:
+            searches[query] = asyncio.create_task(_run_blocking(limits, "tavily", search_web_evidence, query))
+        return searches[query]
+
+    async def _verify(index, claim):
+        if indexed[index] is not None:
+            return _from_index(claim, canonical[index], indexed[index])
+        evidence = await run_once(keys[index], lambda: _verify_and_index(
+            claim, canonical[index], keys[index], limits, web_search_for(index)))
+        return evidence if evidence["claim"] is claim else {**evidence, "claim": claim}
+
+    with span("pipeline.verify"):
+        verified = await asyncio.gather(*(_verify(i, claim) for i, claim in enumerate(claims)))
+    return {
+        "text": user_text,
+        "temporal": {key: extraction[key] for key in ("time_anchors", "consistency_check", "explanation")},
+        "claims": list(verified),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def verify_documents(texts, limits=None):
+    """Verifies many documents at once under one shared set of provider limits."""
+    limits = limits or new_provider_limits()
+    return await asyncio.gather(*(verify_document(text, limits) for text in texts))
+
+
+# --- TEST ---
+if __name__ == "__main__":
+    import json
+
+    setup_logging()
+    text = "Google's Q4 revenue for 2025 was $100 Billion and the stock was at $220 in March 2023"
+    print(json.dumps(asyncio.run(verify_document(text)), indent=2, default=str))
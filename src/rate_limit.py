@@ -0,0 +1,180 @@
+import os
+import time
+import threading
+import multiprocessing as mp
+
+from src.telemetry import observe, count
+
+# ==============================================================================
+# RATE LIMITS
+# Token buckets per provider, and optionally per provider:model. By default
+# each process builds in-process buckets from RATE_LIMITS on first use. The
+# batch runner instead creates shared-memory buckets and installs them in every
+# worker, so all processes draw from one budget. Buckets are adaptive: a 429
+# halves the rate, and each success wins back a little of it.
+# Call acquire(provider, model) right before each live provider call; with a
+# timeout (the request's remaining deadline) it gives up rather than wait past it.
+# ==============================================================================
+# Requests per second per provider (across all processes when shared).
+RATE_LIMITS = {
+    "openai": float(os.getenv("FACT_ENGINE_OPENAI_RPS", "8")),
+    "tavily": float(os.getenv("FACT_ENGINE_TAVILY_RPS", "2")),
+    "yfinance": float(os.getenv("FACT_ENGINE_YFINANCE_RPS", "4")),
+}
+
+
+def _parse_model_rates(text):
+    rates = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        model, _, rate = item.partition("=")
+        rates[f"openai:{model.strip()}"] = float(rate)
+    return rates
+
+
+# Extra per-model buckets, e.g. FACT_ENGINE_MODEL_RPS="gpt-4o=1,gpt-4o-mini=5".
+MODEL_RATE_LIMITS = _parse_model_rates(os.getenv("FACT_ENGINE_MODEL_RPS", ""))
+
+THROTTLE_FACTOR = 0.5        # rate multiplier after a 429
+MIN_RATE_FRACTION = 0.1      # never throttle below this share of the configured rate
+RECOVERY_STEP = 0.05         # share of the configured rate regained per success
+
+_buckets = {}
+_installed = False
+_lock = threading.Lock()
+
+
+class _Cell:
+    """Same interface as mp.RawValue for buckets that live in one process."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class TokenBucket:
+    """Token bucket shared by the threads of one process."""
+
+    def __init__(self, rate, burst=None):
+        self.max_rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._init_state(_Cell(rate), _Cell(self.burst), _Cell(time.monotonic()), threading.Lock())
+
+    def _init_state(self, rate, tokens, updated, lock):
+        self._rate, self._tokens, self._updated, self._lock = rate, tokens, updated, lock
+
+    @property
+    def rate(self):
+        return self._rate.value
+
+    def acquire(self, tokens=1.0, timeout=None):
+        """
+        Blocks until `tokens` are available. Returns the seconds spent waiting, or
+        None (taking nothing) if they would not be available within `timeout` seconds.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._updated.value) * self._rate.value
+                self._tokens.value = min(self.burst, self._tokens.value + refill)
+                self._updated.value = now
+                if self._tokens.value >= tokens:
+                    self._tokens.value -= tokens
+                    return waited
+                shortfall = (tokens - self._tokens.value) / self._rate.value
+            if timeout is not None and waited + shortfall > timeout:
+                return None
+            time.sleep(shortfall)
+            waited += shortfall
+
+    def throttle(self):
+        with self._lock:
+            self._rate.value = max(self.max_rate * MIN_RATE_FRACTION, self._rate.value * THROTTLE_FACTOR)
+
+    def recover(self):
+        if self._rate.value >= self.max_rate:
+            return
+        with self._lock:
+            self._rate.value = min(self.max_rate, self._rate.value + self.max_rate * RECOVERY_STEP)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in shared memory (mp.RawValue + mp.Lock).
+    Create it before starting the workers and pass it to them; they then share one budget.
+    """
+
+    def __init__(self, rate, burst=None, ctx=None):
+        ctx = ctx or mp.get_context()
+        self.max_rate = rate
+        self.burst = burst or max(1.0, rate)
+        # CLOCK_MONOTONIC is system-wide, so timestamps compare across processes.
+        self._init_state(ctx.RawValue("d", rate), ctx.RawValue("d", self.burst),
+                         ctx.RawValue("d", time.monotonic()), ctx.Lock())
+
+
+def _configured_rates(rates=None):
+    return {**RATE_LIMITS, **MODEL_RATE_LIMITS, **(rates or {})}
+
+
+def create_shared_buckets(rates=None, ctx=None):
+    """{key: SharedTokenBucket} for every provider (or provider:model) with a positive rate."""
+    return {key: SharedTokenBucket(rate, ctx=ctx) for key, rate in _configured_rates(rates).items()
+            if rate and rate > 0}
+
+
+def install(buckets):
+    """Makes this process draw from `buckets` only (e.g. from a pool initializer). {} disables limits."""
+    global _installed
+    with _lock:
+        _buckets.clear()
+        _buckets.update(buckets)
+        _installed = True
+
+
+def _bucket(key):
+    bucket = _buckets.get(key)
+    if bucket is None and not _installed:
+        rate = _configured_rates().get(key)
+        if rate and rate > 0:
+            with _lock:
+                bucket = _buckets.setdefault(key, TokenBucket(rate))
+    return bucket
+
+
+def _keys(provider, model):
+    return (provider, f"{provider}:{model}") if model else (provider,)
+
+
+def acquire(provider, model=None, timeout=None):
+    """Waits for a token from each of the provider's buckets. False if that would take over `timeout` seconds."""
+    ends_at = None if timeout is None else time.monotonic() + timeout
+    for key in _keys(provider, model):
+        bucket = _bucket(key)
+        if bucket is None:
+            continue
+        remaining = None if ends_at is None else max(0.0, ends_at - time.monotonic())
+        waited = bucket.acquire(timeout=remaining)
+        if waited is None:
+            count("rate_limit.gave_up", provider=key)
+            return False
+        if waited:
+            observe("rate_limit.wait_seconds", waited, provider=key)
+    return True
+
+
+def throttle(provider, model=None):
+    """The provider answered 429: slow its buckets down."""
+    count("rate_limit.throttled", provider=provider)
+    for key in _keys(provider, model):
+        bucket = _bucket(key)
+        if bucket is not None:
+            bucket.throttle()
+
+
+def recover(provider, model=None):
+    for key in _keys(provider, model):
+        bucket = _bucket(key)
+        if bucket is not None:
+            bucket.recover()
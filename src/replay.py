@@ -0,0 +1,379 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from types import SimpleNamespace
+
+# ==============================================================================
+# RECORD / REPLAY
+# Every OpenAI, Tavily and yfinance call can be captured to a JSON fixture file
+# and played back later without the network. Set FACT_ENGINE_REPLAY to
+#   "off"     live calls (default)
+#   "record"  live calls, each response also written to FACT_ENGINE_FIXTURES
+#   "replay"  fixtures only; a call with no fixture raises FixtureMissing
+# Fixtures are matched on what determines the answer (model, tool, user input,
+# ticker, endpoint), not on system prompts, so rewording a prompt keeps them valid.
+# Embeddings are stored one input per fixture, however the inputs were batched.
+# In replay mode each call can sleep for an injected latency per provider.
+# ==============================================================================
+REPLAY_MODE = os.getenv("FACT_ENGINE_REPLAY", "off")
+FIXTURE_DIR = os.getenv("FACT_ENGINE_FIXTURES", os.path.join("benchmarks", "fixtures"))
+
+# Seconds per call in replay mode, e.g. FACT_ENGINE_REPLAY_LATENCY="openai=0.8,tavily=0.4,yfinance=0.1"
+REPLAY_LATENCY = {"openai": 0.0, "tavily": 0.0, "yfinance": 0.0}
+LATENCY_JITTER = 0.5          # each sleep is latency * uniform(1 - jitter, 1 + jitter)
+
+REPLAY_STATS = {"openai": 0, "tavily": 0, "yfinance": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "recorded": 0, "missing": 0}
+
+_rng = random.Random(0)
+_stats_lock = threading.Lock()
+
+
+class FixtureMissing(LookupError):
+    """Replay mode was asked for a call that was never recorded."""
+
+
+class ReplayedError(RuntimeError):
+    """The recorded call failed; replay raises the same failure again."""
+
+
+def parse_latency(text):
+    latency = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        provider, _, seconds = item.partition("=")
+        latency[provider.strip()] = float(seconds)
+    return latency
+
+
+REPLAY_LATENCY.update(parse_latency(os.getenv("FACT_ENGINE_REPLAY_LATENCY", "")))
+
+
+def set_mode(mode, fixture_dir=None, latency=None, seed=0):
+    """Switches mode at runtime (e.g. from a benchmark). Clients built before the switch are dropped."""
+    global REPLAY_MODE, FIXTURE_DIR
+    if mode not in ("off", "record", "replay"):
+        raise ValueError(f"Unknown replay mode: {mode}")
+    REPLAY_MODE = mode
+    if fixture_dir:
+        FIXTURE_DIR = fixture_dir
+    if latency:
+        REPLAY_LATENCY.update(latency)
+    _rng.seed(seed)
+
+    from src.config import reset_clients
+    reset_clients()
+
+
+def reset_stats():
+    for key in REPLAY_STATS:
+        REPLAY_STATS[key] = 0
+
+
+def _count(key, amount=1):
+    with _stats_lock:
+        REPLAY_STATS[key] += amount
+
+
+def fixture_path(provider, label, match):
+    digest = hashlib.sha256(json.dumps(match, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    safe_label = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+    return os.path.join(FIXTURE_DIR, provider, f"{safe_label}-{digest[:16]}.json")
+
+
+def _write_fixture(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, sort_keys=True, default=str)
+    os.replace(tmp_path, path)
+
+
+def _sleep(provider):
+    latency = REPLAY_LATENCY.get(provider, 0.0)
+    if latency > 0:
+        with _stats_lock:
+            factor = _rng.uniform(1 - LATENCY_JITTER, 1 + LATENCY_JITTER)
+        time.sleep(latency * factor)
+
+
+def replay_call(provider, label, match, live_call):
+    """
+    Runs one provider call through the current mode. `match` identifies the call,
+    `live_call` performs it and returns a JSON-ready value. Recorded failures are
+    raised again as ReplayedError.
+    """
+    _count(provider)
+    path = fixture_path(provider, label, match)
+
+    if REPLAY_MODE == "replay":
+        _sleep(provider)
+        try:
+            with open(path, encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            _count("missing")
+            raise FixtureMissing(f"No {provider} fixture for {label}: {json.dumps(match, default=str)[:200]}")
+        if "error" in fixture:
+            raise ReplayedError(f"{fixture['error']['type']}: {fixture['error']['message']}")
+        return fixture["response"]
+
+    try:
+        response = live_call()
+    except Exception as e:
+        if REPLAY_MODE == "record":
+            _write_fixture(path, {"request": match, "error": {"type": type(e).__name__, "message": str(e)}})
+            _count("recorded")
+        raise
+
+    if REPLAY_MODE == "record":
+        _write_fixture(path, {"request": match, "response": response})
+        _count("recorded")
+    return response
+
+
+def replay_batch(provider, label, matches, live_call):
+    """
+    Like replay_call for a batched call whose items are answered independently
+    (embeddings): one fixture per item, so a replayed batch may group items
+    differently from the recorded one. `live_call` returns one JSON-ready value
+    per match. Counts and sleeps once per batch.
+    """
+    _count(provider)
+    paths = [fixture_path(provider, label, match) for match in matches]
+
+    if REPLAY_MODE == "replay":
+        _sleep(provider)
+        items = []
+        for path, match in zip(paths, matches):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    fixture = json.load(f)
+            except FileNotFoundError:
+                _count("missing")
+                raise FixtureMissing(f"No {provider} fixture for {label}: {json.dumps(match, default=str)[:200]}")
+            if "error" in fixture:
+                raise ReplayedError(f"{fixture['error']['type']}: {fixture['error']['message']}")
+            items.append(fixture["response"])
+        return items
+
+    try:
+        items = live_call()
+    except Exception as e:
+        if REPLAY_MODE == "record":
+            for path, match in zip(paths, matches):
+                _write_fixture(path, {"request": match, "error": {"type": type(e).__name__, "message": str(e)}})
+            _count("recorded", len(paths))
+        raise
+
+    if REPLAY_MODE == "record":
+        for path, match, item in zip(paths, matches, items):
+            _write_fixture(path, {"request": match, "response": item})
+        _count("recorded", len(paths))
+    return items
+
+
+def _namespace(value):
+    """JSON -> attribute access, so replayed responses read like SDK objects."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_namespace(v) for v in value]
+    return value
+
+
+# --- OpenAI ---
+
+class ReplayOpenAI:
+    """Stands in for an OpenAI client: chat.completions.create and embeddings.create."""
+
+    def __init__(self, live=None):
+        self._live = live
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.embeddings = SimpleNamespace(create=self._embed)
+
+    def _chat(self, **kwargs):
+        tools = [t["function"]["name"] for t in kwargs.get("tools") or []]
+        stream = bool(kwargs.get("stream"))
+        match = {
+            "model": kwargs.get("model"),
+            "tools": tools,
+            "stream": stream,
+            "user": [m["content"] for m in kwargs["messages"] if m["role"] == "user"],
+        }
+
+        if stream:
+            chunks = replay_call("openai", tools[0] if tools else "chat", match,
+                                 lambda: [c.model_dump() for c in self._live.chat.completions.create(**kwargs)])
+            for chunk in chunks:
+                self._count_usage(chunk)
+            return iter(_namespace(chunks))
+
+        response = replay_call("openai", tools[0] if tools else "chat", match,
+                               lambda: self._live.chat.completions.create(**kwargs).model_dump())
+        self._count_usage(response)
+        return _namespace(response)
+
+    def _embed(self, **kwargs):
+        model, inputs = kwargs.get("model"), kwargs.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+
+        def _live_call():
+            # Batch usage is split over the inputs by length, so replayed token counts add up.
+            response = self._live.embeddings.create(**kwargs).model_dump()
+            tokens = (response.get("usage") or {}).get("prompt_tokens") or 0
+            total = sum(len(text) for text in inputs) or 1
+            return [{"embedding": item["embedding"], "prompt_tokens": round(tokens * len(inputs[item["index"]]) / total)}
+                    for item in sorted(response["data"], key=lambda d: d["index"])]
+
+        items = replay_batch("openai", "embedding", [{"model": model, "input": text} for text in inputs], _live_call)
+        response = {
+            "object": "list", "model": model,
+            "data": [{"object": "embedding", "index": i, "embedding": item["embedding"]} for i, item in enumerate(items)],
+            "usage": {"prompt_tokens": sum(item["prompt_tokens"] for item in items),
+                      "total_tokens": sum(item["prompt_tokens"] for item in items)},
+        }
+        self._count_usage(response)
+        return _namespace(response)
+
+    @staticmethod
+    def _count_usage(response):
+        usage = response.get("usage") or {}
+        _count("prompt_tokens", usage.get("prompt_tokens") or 0)
+        _count("completion_tokens", usage.get("completion_tokens") or 0)
+
+
+# --- Tavily ---
+
+class ReplayTavily:
+    def __init__(self, live=None):
+        self._live = live
+
+    def search(self, **kwargs):
+        return replay_call("tavily", "search", kwargs, lambda: self._live.search(**kwargs))
+
+
+def replayable_client(provider, factory):
+    """Wraps the client `factory` builds for the current mode. Replay mode never builds it."""
+    if REPLAY_MODE == "off":
+        return factory()
+    wrapper = {"openai": ReplayOpenAI, "tavily": ReplayTavily}[provider]
+    return wrapper(None if REPLAY_MODE == "replay" else factory())
+
+
+# --- yfinance ---
+
+def _encode_axis(axis):
+    import pandas as pd
+
+    if isinstance(axis, pd.DatetimeIndex):
+        tz = str(axis.tz) if axis.tz is not None else None
+        dates = axis.tz_convert("UTC") if tz else axis
+        return {"dates": [d.isoformat() for d in dates], "tz": tz, "name": axis.name}
+    if isinstance(axis, pd.MultiIndex):
+        return {"tuples": [list(t) for t in axis], "names": list(axis.names)}
+    return {"labels": [str(label) if isinstance(label, pd.Timestamp) else label for label in axis],
+            "name": axis.name}
+
+
+def _decode_axis(encoded):
+    import pandas as pd
+
+    if "dates" in encoded:
+        if encoded["tz"]:
+            return pd.DatetimeIndex(pd.to_datetime(encoded["dates"], utc=True).tz_convert(encoded["tz"]),
+                                    name=encoded["name"])
+        return pd.DatetimeIndex(pd.to_datetime(encoded["dates"]), name=encoded["name"])
+    if "tuples" in encoded:
+        return pd.MultiIndex.from_tuples([tuple(t) for t in encoded["tuples"]], names=encoded["names"])
+    return pd.Index(encoded["labels"], name=encoded["name"])
+
+
+def encode_frame(frame):
+    return {
+        "index": _encode_axis(frame.index),
+        "columns": _encode_axis(frame.columns),
+        "data": frame.to_numpy(dtype=object).tolist(),
+    }
+
+
+def decode_frame(encoded):
+    import pandas as pd
+
+    frame = pd.DataFrame(encoded["data"], index=_decode_axis(encoded["index"]),
+                         columns=_decode_axis(encoded["columns"]))
+    return frame.infer_objects()
+
+
+def _plain(value):
+    """numpy scalars and similar -> JSON types."""
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+_FRAME_ENDPOINTS = {"financials", "quarterly_financials", "balance_sheet", "quarterly_balance_sheet",
+                    "income_stmt", "quarterly_income_stmt", "cashflow", "quarterly_cashflow"}
+
+
+class _ReplayFastInfo:
+    def __init__(self, ticker):
+        self._ticker = ticker
+
+    def __getitem__(self, field):
+        ticker = self._ticker
+        return ticker._call("fast_info", {"field": field}, lambda: _plain(ticker._live.fast_info[field]))
+
+
+class ReplayTicker:
+    """Stands in for yf.Ticker: fast_info[...], info, statement frames and history()."""
+
+    def __init__(self, symbol, live=None):
+        self.ticker = symbol
+        self._live = live
+
+    def _call(self, endpoint, args, live_call):
+        return replay_call("yfinance", f"{self.ticker}-{endpoint}",
+                           {"ticker": self.ticker, "endpoint": endpoint, **args}, live_call)
+
+    @property
+    def fast_info(self):
+        return _ReplayFastInfo(self)
+
+    @property
+    def info(self):
+        return self._call("info", {}, lambda: self._live.info)
+
+    def history(self, **kwargs):
+        return decode_frame(self._call("history", kwargs, lambda: encode_frame(self._live.history(**kwargs))))
+
+    def __getattr__(self, name):
+        if name not in _FRAME_ENDPOINTS:
+            raise AttributeError(name)
+        return decode_frame(self._call(name, {}, lambda: encode_frame(getattr(self._live, name))))
+
+
+def open_ticker(symbol):
+    """yf.Ticker(symbol) for the current mode."""
+    if REPLAY_MODE == "replay":
+        return ReplayTicker(symbol)
+
+    import yfinance as yf  # deferred: yfinance pulls in pandas
+
+    stock = yf.Ticker(symbol)
+    return ReplayTicker(symbol, stock) if REPLAY_MODE == "record" else stock
+
+
+def download(tickers, **kwargs):
+    """yf.download(tickers, **kwargs) for the current mode."""
+    def _live_call():
+        import yfinance as yf
+        return yf.download(tickers, **kwargs)
+
+    if REPLAY_MODE == "off":
+        return _live_call()
+
+    match = {"tickers": sorted(tickers), **{k: v for k, v in kwargs.items() if k not in ("threads", "progress")}}
+    return decode_frame(replay_call("yfinance", "download", match, lambda: encode_frame(_live_call())))
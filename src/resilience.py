@@ -0,0 +1,227 @@
+import os
+import time
+import random
+import logging
+import contextvars
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from src.rate_limit import acquire, throttle, recover
+from src.telemetry import count
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# RESILIENCE
+# Every live OpenAI, Tavily and Yahoo call goes through call_provider(): it
+# waits for the provider's rate-limit bucket, makes the call, and on failure
+# sorts the error into one of three kinds.
+#   rate_limited  429: the bucket is throttled, then retried after Retry-After
+#   transient     timeouts, dropped connections, 5xx: retried with backoff
+#   permanent     bad request, auth, unknown ticker: raised straight away
+# Retries use exponential backoff with full jitter and stop at the request
+# deadline. Deadlines live in a context variable, so one set around a document
+# covers every call made for it, including those run via asyncio.to_thread.
+# Whatever still fails is raised as TransientError or PermanentError.
+# ==============================================================================
+MAX_ATTEMPTS = int(os.getenv("FACT_ENGINE_MAX_ATTEMPTS", "4"))
+BASE_BACKOFF = 0.5            # seconds; the n-th retry waits up to BASE_BACKOFF * 2**n
+MAX_BACKOFF = 20.0
+MAX_RETRY_AFTER = 60.0        # never honour a Retry-After longer than this
+
+RATE_LIMITED, TRANSIENT, PERMANENT = "rate_limited", "transient", "permanent"
+
+# Keyword arguments through which a provider's SDK takes a per-call timeout.
+TIMEOUT_ARGUMENTS = {"openai": "timeout"}
+
+_TRANSIENT_STATUS = {408, 409, 425}
+_RATE_LIMIT_NAMES = ("RateLimit", "TooManyRequests")
+_TRANSIENT_NAMES = ("Timeout", "Connection", "Temporar", "Unavailable", "InternalServer")
+
+_DEADLINE = contextvars.ContextVar("fact_engine_deadline", default=None)
+_rng = random.Random()
+
+
+class ProviderError(Exception):
+    """A provider call that failed for good. `cause` is the last underlying error."""
+
+    kind = None
+
+    def __init__(self, provider, cause=None, attempts=0, message=None):
+        self.provider = provider
+        self.cause = cause
+        self.attempts = attempts
+        super().__init__(message or f"{provider} failed after {attempts} attempt(s): {cause!r}")
+
+
+class TransientError(ProviderError):
+    """Retries ran out (outage, throttling). The same request may succeed later."""
+
+    kind = TRANSIENT
+
+
+class PermanentError(ProviderError):
+    """The request itself is wrong (bad input, auth, unknown symbol). Retrying will not help."""
+
+    kind = PERMANENT
+
+
+class DeadlineExceeded(TransientError):
+    def __init__(self, provider, cause=None, attempts=0):
+        super().__init__(provider, cause, attempts, f"{provider}: request deadline exceeded after "
+                                                    f"{attempts} attempt(s)")
+
+
+# --- deadlines ---
+
+@contextmanager
+def deadline(seconds):
+    """
+    Calls inside the block must finish within `seconds`. Nested deadlines can only
+    tighten the outer one. None leaves the current deadline as it is.
+    """
+    if seconds is None:
+        yield
+        return
+    current = _DEADLINE.get()
+    ends_at = time.monotonic() + seconds
+    token = _DEADLINE.set(ends_at if current is None else min(current, ends_at))
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def time_left():
+    """Seconds until the current deadline (never negative), or None without one."""
+    ends_at = _DEADLINE.get()
+    return None if ends_at is None else max(0.0, ends_at - time.monotonic())
+
+
+# --- classification ---
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _error_name(error):
+    # A replayed failure keeps the original exception's name at the start of its message.
+    if type(error).__name__ == "ReplayedError":
+        return str(error).partition(":")[0]
+    return type(error).__name__
+
+
+def classify(error):
+    """RATE_LIMITED, TRANSIENT or PERMANENT for an exception raised by a provider SDK."""
+    if isinstance(error, ProviderError):
+        return error.kind
+    status = _status_code(error)
+    if status == 429:
+        # OpenAI answers 429 for an exhausted quota as well; waiting will not fix that.
+        return PERMANENT if getattr(error, "code", None) == "insufficient_quota" else RATE_LIMITED
+    if status is not None:
+        return TRANSIENT if status >= 500 or status in _TRANSIENT_STATUS else PERMANENT
+
+    name = _error_name(error)
+    if any(word in name for word in _RATE_LIMIT_NAMES):
+        return RATE_LIMITED
+    if any(word in name for word in _TRANSIENT_NAMES):
+        return TRANSIENT
+    # requests' and urllib3's network errors derive from OSError.
+    if isinstance(error, (TimeoutError, ConnectionError, OSError)):
+        return TRANSIENT
+    return PERMANENT
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait (Retry-After / retry-after-ms), or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        milliseconds = headers.get("retry-after-ms")
+        if milliseconds:
+            return float(milliseconds) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def backoff(attempt, requested=None):
+    """Full-jitter exponential delay before retry number `attempt`, at least `requested`."""
+    delay = _rng.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt))
+    if requested:
+        delay = max(delay, min(requested, MAX_RETRY_AFTER))
+    return delay
+
+
+def describe_error(error):
+    """A JSON-ready outcome for a failed source: {kind, provider, message}."""
+    return {
+        "kind": TRANSIENT if classify(error) in (TRANSIENT, RATE_LIMITED) else PERMANENT,
+        "provider": getattr(error, "provider", None),
+        "message": str(error) or repr(error),
+    }
+
+
+# --- the call wrapper ---
+
+def call_provider(provider, func, *args, span=None, max_attempts=None, **kwargs):
+    """
+    func(*args, **kwargs) under the provider's rate limit, with retries.
+    OpenAI calls also wait on their model's bucket and get the remaining deadline
+    as their timeout; no call waits for a rate-limit token past the deadline.
+    Retries are added to `span` as `retries`.
+    Raises TransientError / PermanentError when the call cannot succeed.
+    """
+    model = kwargs.get("model") if provider == "openai" else None
+    timeout_argument = TIMEOUT_ARGUMENTS.get(provider)
+    max_attempts = max_attempts or MAX_ATTEMPTS
+    attempts = 0
+
+    while True:
+        remaining = time_left()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded(provider, attempts=attempts)
+            if timeout_argument:
+                kwargs[timeout_argument] = remaining
+
+        if not acquire(provider, model, timeout=remaining):
+            raise DeadlineExceeded(provider, attempts=attempts)
+        attempts += 1
+        try:
+            result = func(*args, **kwargs)
+        except ProviderError:
+            raise
+        except Exception as e:
+            kind = classify(e)
+            count("resilience.errors", provider=provider, kind=kind)
+            if kind == PERMANENT:
+                raise PermanentError(provider, e, attempts) from e
+            if kind == RATE_LIMITED:
+                throttle(provider, model)
+            if attempts >= max_attempts:
+                raise TransientError(provider, e, attempts) from e
+
+            delay = backoff(attempts, retry_after(e))
+            remaining = time_left()
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceeded(provider, e, attempts) from e
+            logger.info("%s call failed (%s), retry %d in %.1fs", provider, _error_name(e), attempts, delay)
+            count("resilience.retries", provider=provider)
+            if span is not None:
+                span.set(retries=1)
+            time.sleep(delay)
+        else:
+            recover(provider, model)
+            return result
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+
+# ==============================================================================
+# TELEMETRY
+# Spans time each LLM call, search and yfinance fetch and carry what it cost
+# (tokens, bytes, cache hits, retries). Everything lands in an in-process
+# aggregator: one histogram per span and a counter per measurement, labelled by
+# a few low-cardinality tags (agent, endpoint, namespace). snapshot() returns it
+# as a dict and export_prometheus() as Prometheus text. With FACT_ENGINE_OTEL=1
+# and opentelemetry installed, spans are also forwarded to its tracer.
+# FACT_ENGINE_TELEMETRY=0 turns every call here into a no-op.
+# ==============================================================================
+TELEMETRY_ENABLED = os.getenv("FACT_ENGINE_TELEMETRY", "1") != "0"
+OTEL_ENABLED = os.getenv("FACT_ENGINE_OTEL") == "1"
+LOG_LEVEL = os.getenv("FACT_ENGINE_LOG_LEVEL", "INFO")
+METRIC_PREFIX = "fact_engine"
+
+# Span duration buckets in seconds (upper bounds).
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_counters = {}
+_histograms = {}
+_lock = threading.Lock()
+_tracer = None
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory, approximate percentiles."""
+
+    __slots__ = ("bounds", "buckets", "count", "sum", "max")
+
+    def __init__(self, bounds=DURATION_BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)      # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """Linear interpolation inside the bucket holding the pct-th observation."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, in_bucket in enumerate(self.buckets):
+            if in_bucket and seen + in_bucket >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / in_bucket, self.max)
+            seen += in_bucket
+        return self.max
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def count(name, amount=1, **labels):
+    """Adds `amount` to the counter `name` (e.g. count("cache.hits", namespace="tavily.search"))."""
+    if not TELEMETRY_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(name, value, **labels):
+    if not TELEMETRY_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+
+def payload_size(value):
+    """Rough size in bytes of a fetched payload (text, dict/list, or DataFrame)."""
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(index=True).sum())
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class Span:
+    """
+    Times a block and records it on exit as `<name>.seconds` plus `<name>.calls`
+    (and `<name>.errors` if it raised). Measurements added with set() become
+    counters named `<name>.<measurement>`.
+    """
+
+    __slots__ = ("name", "labels", "values", "started", "_otel")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.values = {}
+        self.started = 0.0
+        self._otel = None
+
+    def __enter__(self):
+        if OTEL_ENABLED:
+            tracer = _get_tracer()
+            if tracer is not None:
+                self._otel = tracer.start_as_current_span(self.name, attributes=self.labels)
+                self._otel.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        observe(f"{self.name}.seconds", elapsed, **self.labels)
+        count(f"{self.name}.calls", **self.labels)
+        if exc_type is not None:
+            count(f"{self.name}.errors", **self.labels)
+        for measurement, amount in self.values.items():
+            count(f"{self.name}.{measurement}", amount, **self.labels)
+
+        if self._otel is not None:
+            from opentelemetry import trace
+            current = trace.get_current_span()
+            for measurement, amount in self.values.items():
+                current.set_attribute(measurement, amount)
+            self._otel.__exit__(exc_type, exc, tb)
+        return False
+
+    def set(self, **values):
+        """Adds measurements, e.g. span.set(bytes=1024, retries=1, cache_hit=True)."""
+        for measurement, amount in values.items():
+            self.values[measurement] = self.values.get(measurement, 0) + int(amount)
+
+    def usage(self, response):
+        """Token counts from an OpenAI response (or stream chunk) that carries `usage`."""
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.set(prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                     completion_tokens=getattr(usage, "completion_tokens", 0) or 0)
+
+    def payload(self, value):
+        self.set(bytes=payload_size(value))
+
+
+class _NoopSpan:
+    """What span() returns when telemetry is disabled: every method does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **values):
+        pass
+
+    def usage(self, response):
+        pass
+
+    def payload(self, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **labels):
+    """with span("openai.chat", agent="planner") as s: ...; s.usage(response)"""
+    if not TELEMETRY_ENABLED:
+        return _NOOP_SPAN
+    return Span(name, labels)
+
+
+def _get_tracer():
+    global _tracer, OTEL_ENABLED
+    if _tracer is None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            OTEL_ENABLED = False  # optional dependency; keep the in-process aggregator only
+            return None
+        _tracer = trace.get_tracer("fact_engine")
+    return _tracer
+
+
+def enable(flag=True):
+    global TELEMETRY_ENABLED
+    TELEMETRY_ENABLED = flag
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _label_text(labels):
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def snapshot():
+    """{"counters": {"name{labels}": value}, "histograms": {"name{labels}": {count, sum, p50, p95, max}}}"""
+    with _lock:
+        counters = {f"{name}{{{_label_text(labels)}}}": value for (name, labels), value in sorted(_counters.items())}
+        histograms = {
+            f"{name}{{{_label_text(labels)}}}": {
+                "count": h.count,
+                "sum": round(h.sum, 6),
+                "p50": round(h.percentile(50), 6),
+                "p95": round(h.percentile(95), 6),
+                "max": round(h.max, 6),
+            }
+            for (name, labels), h in sorted(_histograms.items())
+        }
+    return {"counters": counters, "histograms": histograms}
+
+
+def _metric_name(name, suffix=""):
+    return f"{METRIC_PREFIX}_{name.replace('.', '_').replace('-', '_')}{suffix}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _prom_labels(labels, extra=()):
+    items = [*labels, *extra]
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def export_prometheus():
+    """The aggregator in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = _metric_name(name, "_total")
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_prom_labels(labels)} {value}")
+
+        for (name, labels), h in histograms:
+            metric = _metric_name(name)
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, in_bucket in zip([*h.bounds, "+Inf"], h.buckets):
+                cumulative += in_bucket
+                lines.append(f"{metric}_bucket{_prom_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{metric}_sum{_prom_labels(labels)} {h.sum:.6f}")
+            lines.append(f"{metric}_count{_prom_labels(labels)} {h.count}")
+    return "\n".join(lines) + "\n"
+
+
+def setup_logging(level=None):
+    """Levelled logging for the CLI and the module demos (FACT_ENGINE_LOG_LEVEL, default INFO)."""
+    level = level or LOG_LEVEL
+    logging.basicConfig(
+        level=level.upper() if isinstance(level, str) else level,
+        format="%(asctime)s %(levelname)-7s %(name)s: %(message)s",
+    )
@@ -0,0 +1,260 @@
+import re
+import time
+import logging
+import threading
+import numpy as np
+
+from src.telemetry import count
+from src.resilience import TransientError
+from src.tools.results import MetricValue, clean_number
+from src.tools.ticker_cache import get_snapshot, ENDPOINT_TTLS
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# FUNDAMENTALS INDEX
+# One columnar index per ticker over the annual and quarterly income statement
+# and balance sheet plus the numeric fields of `info`. Each statement and
+# frequency becomes a float matrix of line items x period ends (oldest first),
+# so a lookup is a row index and a column search, and QoQ / YoY growth for
+# every line item is one vectorized division. Parts are built on first use and
+# then shared by every metric of the ticker; the raw frames stay in the ticker
+# snapshot cache, so a rebuild after FUNDAMENTALS_TTL only re-reads them.
+# ==============================================================================
+STATEMENT_ENDPOINTS = {
+    ("income", "FY"): "financials",
+    ("income", "Q"): "quarterly_financials",
+    ("balance", "FY"): "balance_sheet",
+    ("balance", "Q"): "quarterly_balance_sheet",
+}
+STATEMENTS = ("income", "balance")    # searched in this order for an item not in LINE_ITEMS
+
+# The statement that reports each line item the tools ask for, so a lookup only
+# builds (and fetches) that statement.
+LINE_ITEMS = {
+    "Total Revenue": "income",
+    "Net Income": "income",
+    "Total Debt": "balance",
+    "Cash Cash Equivalents And Short Term Investments": "balance",
+    "Cash And Cash Equivalents": "balance",
+}
+INFO_FIELDS = ("trailingPE", "forwardPE", "totalCash", "totalDebt", "totalCashPerShare",
+               "revenueGrowth", "earningsGrowth", "targetMeanPrice")
+
+# The index follows the shortest-lived source it reads.
+FUNDAMENTALS_TTL = ENDPOINT_TTLS["info"]
+
+# Growth is only computed between periods this far apart (days), +/- GAP_TOLERANCE.
+PERIOD_DAYS = {"FY": 365, "Q": 91}
+GAP_TOLERANCE = 20
+
+FUNDAMENTALS_STATS = {"builds": 0, "hits": 0, "statements": 0}
+
+_PERIOD_PATTERN = re.compile(
+    r"^\s*(?:fy\s*(?P<fy>\d{4})|q(?P<q1>[1-4])\s*(?P<y1>\d{4})|(?P<y2>\d{4})\s*-?\s*q(?P<q2>[1-4])|(?P<y3>\d{4}))\s*$",
+    re.IGNORECASE,
+)
+
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+
+def parse_period(text):
+    """'FY2024' / '2024' -> ('FY', 2024, None); 'Q3 2025' / '2025-Q3' -> ('Q', 2025, 3). None if unparseable."""
+    match = _PERIOD_PATTERN.match(str(text or ""))
+    if not match:
+        return None
+    if match.group("q1") or match.group("q2"):
+        return "Q", int(match.group("y1") or match.group("y2")), int(match.group("q1") or match.group("q2"))
+    return "FY", int(match.group("fy") or match.group("y3")), None
+
+
+class StatementBlock:
+    """Line items x period ends for one frequency. `values` has NaN where a statement has no entry."""
+
+    __slots__ = ("frequency", "items", "rows", "ends", "values", "_growth")
+
+    def __init__(self, frequency, items, ends, values):
+        self.frequency = frequency
+        self.items = items
+        self.rows = {item: row for row, item in enumerate(items)}
+        self.ends = ends
+        self.values = values
+        self._growth = {}
+
+    @classmethod
+    def from_frame(cls, frequency, frame):
+        """Converts a yfinance statement frame (line items x period-end columns)."""
+        if frame is None or frame.empty:
+            return cls(frequency, (), np.array([], dtype="datetime64[D]"), np.empty((0, 0)))
+        import pandas as pd  # deferred: only needed while building
+
+        frame = frame[~frame.index.duplicated()].apply(pd.to_numeric, errors="coerce")
+        frame.columns = pd.to_datetime(frame.columns).tz_localize(None).normalize()
+        frame = frame.sort_index(axis=1)
+        return cls(frequency, tuple(str(item) for item in frame.index),
+                   frame.columns.values.astype("datetime64[D]"), frame.to_numpy(dtype="f8"))
+
+    def column(self, year, quarter=None):
+        """Index of the period ending in `year` (and calendar quarter, give or take a month), or None."""
+        years = self.ends.astype("datetime64[Y]").astype(int) + 1970
+        matches = years == year
+        if quarter:
+            months = self.ends.astype("datetime64[M]").astype(int) % 12 + 1
+            matches &= np.abs(months - 3 * quarter) <= 1
+        found = np.flatnonzero(matches)
+        return int(found[-1]) if len(found) else None
+
+    def growth(self, lag):
+        """(period ends, % change matrix) against `lag` periods back; NaN where periods don't line up."""
+        cached = self._growth.get(lag)
+        if cached is not None:
+            return cached
+        if self.values.shape[1] <= lag:
+            result = (self.ends[:0], self.values[:, :0])
+        else:
+            previous, current = self.values[:, :-lag], self.values[:, lag:]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change = (current - previous) / np.abs(previous) * 100
+            change[~np.isfinite(change)] = np.nan
+            gaps = (self.ends[lag:] - self.ends[:-lag]).astype(int)
+            change[:, np.abs(gaps - lag * PERIOD_DAYS[self.frequency]) > GAP_TOLERANCE] = np.nan
+            result = (self.ends[lag:], change)
+        self._growth[lag] = result
+        return result
+
+
+class FundamentalsIndex:
+    """Statements and ratios of one ticker, keyed by (line item, period end)."""
+
+    def __init__(self, snapshot):
+        self.ticker = snapshot.ticker
+        self._snapshot = snapshot
+        self._blocks = {}
+        self._info = None
+        self._lock = threading.Lock()
+
+    def _read(self, endpoint):
+        try:
+            return self._snapshot.get(endpoint)
+        except TransientError:
+            raise
+        except Exception as e:
+            # ETFs and some foreign listings have no statements; that part stays empty.
+            logger.debug("Fundamentals: no %s for %s: %s", endpoint, self.ticker, e)
+            return None
+
+    def block(self, statement, frequency):
+        """The StatementBlock for ("income" | "balance", "FY" | "Q"), built on first use."""
+        key = (statement, frequency)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None:
+                block = self._blocks[key] = StatementBlock.from_frame(frequency, self._read(STATEMENT_ENDPOINTS[key]))
+                FUNDAMENTALS_STATS["statements"] += 1
+        return block
+
+    def _row(self, item, frequency):
+        """(block, row) of the statement holding `item`, reading only its owner when LINE_ITEMS knows it."""
+        owner = LINE_ITEMS.get(item)
+        for statement in (owner,) if owner else STATEMENTS:
+            block = self.block(statement, frequency)
+            row = block.rows.get(item)
+            if row is not None:
+                return block, row
+        return None, None
+
+    @property
+    def info(self):
+        """{field: float or None} for INFO_FIELDS."""
+        if self._info is None:
+            info = self._read("info") or {}
+            self._info = {field: clean_number(info.get(field)) for field in INFO_FIELDS}
+        return self._info
+
+    def value(self, item, period):
+        """
+        e.g. value("Total Revenue", "FY2024") or value("Net Income", "Q3 2025").
+        Returns (value, period end ISO date) or None.
+        """
+        parsed = parse_period(period)
+        if parsed is None:
+            return None
+        frequency, year, quarter = parsed
+        block, row = self._row(item, frequency)
+        if block is None:
+            return None
+        column = block.column(year, quarter)
+        if column is None or np.isnan(block.values[row, column]):
+            return None
+        return float(block.values[row, column]), str(block.ends[column])
+
+    def series(self, item, frequency):
+        """[(period end, value)] newest first, skipping periods without a value."""
+        block, row = self._row(item, frequency)
+        if block is None:
+            return []
+        values = block.values[row]
+        return [(str(block.ends[i]), float(values[i])) for i in np.flatnonzero(~np.isnan(values))[::-1]]
+
+    def growth(self, item, frequency, lag=1):
+        """[(period end, % change vs `lag` periods back)] newest first."""
+        block, row = self._row(item, frequency)
+        if block is None:
+            return []
+        ends, change = block.growth(lag)
+        values = change[row]
+        return [(str(ends[i]), float(values[i])) for i in np.flatnonzero(~np.isnan(values))[::-1]]
+
+    def latest(self, items, frequency="Q"):
+        """(value, period end) of the first of `items` present in the latest period that has it."""
+        for item in items:
+            found = self.series(item, frequency)
+            if found:
+                return found[0][1], found[0][0]
+        return None, None
+
+    def statement_values(self, item, label):
+        """
+        MetricValues for a statement line: the annual and quarterly series plus their
+        YoY and QoQ growth, labelled "Annual {label}", "Quarterly {label} QoQ", ...
+        """
+        annual, quarterly = f"Annual {label}", f"Quarterly {label}"
+        values = [MetricValue(annual, value, "USD", day, "FY") for day, value in self.series(item, "FY")]
+        values += [MetricValue(quarterly, value, "USD", day, "Q") for day, value in self.series(item, "Q")]
+        values += [MetricValue(f"{annual} YoY", change, "percent", day, "yoy")
+                   for day, change in self.growth(item, "FY", 1)]
+        values += [MetricValue(f"{quarterly} QoQ", change, "percent", day, "qoq")
+                   for day, change in self.growth(item, "Q", 1)]
+        values += [MetricValue(f"{quarterly} YoY", change, "percent", day, "yoy")
+                   for day, change in self.growth(item, "Q", 4)]
+        return values
+
+
+def load_fundamentals(ticker, build=True):
+    """
+    The FundamentalsIndex for `ticker`, built at most once per FUNDAMENTALS_TTL. None if
+    unknown, or with build=False when no fresh index is in memory (nothing is fetched).
+    """
+    ticker = ticker.upper()
+    entry = _INDEXES.get(ticker)
+    if entry and time.monotonic() - entry[0] < FUNDAMENTALS_TTL:
+        FUNDAMENTALS_STATS["hits"] += 1
+        return entry[1]
+    if not build:
+        return None
+
+    snapshot = get_snapshot(ticker)
+    if snapshot is None:
+        return None
+    index = FundamentalsIndex(snapshot)
+    with _LOCK:
+        _INDEXES[ticker] = (time.monotonic(), index)
+    FUNDAMENTALS_STATS["builds"] += 1
+    count("fundamentals.builds")
+    return index
+
+
+def clear_fundamentals():
+    with _LOCK:
+        _INDEXES.clear()
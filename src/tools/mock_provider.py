@@ -0,0 +1,54 @@
+import time
+import random
+from src.tools.results import MetricResult, MetricValue
+
+# ==============================================================================
+# MOCK PROVIDER
+# Offline stand-in for a market-data API. Latency and failure rate are tunable so
+# the DB agent's racing, hedging and circuit breakers can be exercised locally.
+# ==============================================================================
+# (label, value, unit, as_of, period) rows per ticker and metric key.
+MOCK_DATA = {
+    "TSLA": {
+        "price": [("Price", 250.0, "USD", "2025-06-30", "current")],
+        "market_cap": [("Market Cap", 800.0e9, "USD", "2025-06-30", "current")],
+        "total_revenue": [("Annual Revenue", 97.69e9, "USD", "2024-12-31", "FY"),
+                          ("Annual Revenue", 96.77e9, "USD", "2023-12-31", "FY")],
+        "net_income": [("Annual Net Income", 7.13e9, "USD", "2024-12-31", "FY"),
+                       ("Annual Net Income", 15.0e9, "USD", "2023-12-31", "FY")],
+    },
+    "AAPL": {
+        "price": [("Price", 230.0, "USD", "2025-06-30", "current")],
+        "market_cap": [("Market Cap", 3500.0e9, "USD", "2025-06-30", "current")],
+        "historical_price": [("Year-End Close", 250.42, "USD", "2024-12-31", "year_end"),
+                             ("Year-End Close", 192.53, "USD", "2023-12-29", "year_end"),
+                             ("Year-End Close", 129.93, "USD", "2022-12-30", "year_end")],
+        "dividend_yield": [("Dividend Yield", 0.44, "percent", "2025-06-30", "ttm"),
+                           ("Payout Ratio", 15.0, "percent", "2025-06-30", "ttm")],
+    },
+    "GOOGL": {
+        "price": [("Price", 180.0, "USD", "2025-06-30", "current")],
+        "total_revenue": [("Annual Revenue", 350.02e9, "USD", "2024-12-31", "FY"),
+                          ("Annual Revenue", 307.39e9, "USD", "2023-12-31", "FY")],
+        "historical_price": [("Year-End Close", 189.3, "USD", "2024-12-31", "year_end"),
+                             ("Year-End Close", 139.69, "USD", "2023-12-29", "year_end"),
+                             ("Year-End Close", 88.23, "USD", "2022-12-30", "year_end")],
+    },
+}
+SUPPORTED_METRICS = sorted({key for metrics in MOCK_DATA.values() for key in metrics})
+
+MOCK_LATENCY = 0.05          # seconds, mean
+MOCK_LATENCY_JITTER = 0.02
+MOCK_FAILURE_RATE = 0.0      # probability of raising instead of answering
+
+
+def fetch_mock_data(ticker, metric_key):
+    time.sleep(max(0.0, random.gauss(MOCK_LATENCY, MOCK_LATENCY_JITTER)))
+
+    if random.random() < MOCK_FAILURE_RATE:
+        raise ConnectionError("[Mock Provider] Simulated outage")
+
+    rows = MOCK_DATA.get(ticker.upper(), {}).get(metric_key)
+    if not rows:
+        return None
+    return MetricResult(ticker.upper(), metric_key, [MetricValue(*row) for row in rows], source="mock")
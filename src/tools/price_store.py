@@ -0,0 +1,200 @@
+import os
+import time
+import logging
+import numpy as np
+from src.telemetry import span
+from src.resilience import call_provider, TransientError
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# LOCAL PRICE STORE
+# Daily OHLCV bars per ticker, kept as one structured .npy file each and read
+# back memory-mapped. A refresh only downloads the dates after the last stored
+# bar, and every query is a vectorized lookup over the local arrays.
+# ==============================================================================
+PRICE_STORE_DIR = os.getenv("FACT_ENGINE_PRICE_STORE", os.path.join(".cache", "prices"))
+INITIAL_PERIOD = "10y"
+REFRESH_SECONDS = 15 * 60      # how long an up-to-date check stays valid in this process
+
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+STORE_STATS = {"local_reads": 0, "refreshes": 0, "bars_downloaded": 0, "stale_reads": 0}
+
+_LAST_CHECKED = {}
+
+
+def _path(ticker):
+    return os.path.join(PRICE_STORE_DIR, f"{ticker.upper()}.npy")
+
+
+def _to_day(value):
+    return np.datetime64(value, "D")
+
+
+def parse_period(period_text):
+    """'2023' -> the whole year, '2023-03' -> March 2023, '2023-03-15' -> that day. Returns (start, end)."""
+    period_text = period_text.strip()
+    if len(period_text) == 4:
+        start = np.datetime64(period_text, "Y")
+        return start.astype("datetime64[D]"), (start + 1).astype("datetime64[D]") - 1
+    if len(period_text) == 7:
+        start = np.datetime64(period_text, "M")
+        return start.astype("datetime64[D]"), (start + 1).astype("datetime64[D]") - 1
+    day = _to_day(period_text)
+    return day, day
+
+
+class PriceSeries:
+    """Read-only view over one ticker's bars. Dates are sorted and unique."""
+
+    def __init__(self, ticker, bars):
+        self.ticker = ticker
+        self.bars = bars
+        self.dates = bars["date"]
+
+    def __len__(self):
+        return len(self.bars)
+
+    def _slice(self, start, end):
+        lo = np.searchsorted(self.dates, _to_day(start), side="left")
+        hi = np.searchsorted(self.dates, _to_day(end), side="right")
+        return self.bars[lo:hi]
+
+    def close_on(self, day):
+        """Close of the last session on or before `day` (None before the first bar)."""
+        index = np.searchsorted(self.dates, _to_day(day), side="right") - 1
+        return float(self.bars["close"][index]) if index >= 0 else None
+
+    def year_end_sessions(self, since_year=None):
+        """[(date, close)] of the last session of each year, newest first."""
+        years = self.dates.astype("datetime64[Y]").astype(int) + 1970
+        last_of_year = np.flatnonzero(np.r_[years[1:] != years[:-1], True])
+        if since_year is not None:
+            last_of_year = last_of_year[years[last_of_year] >= since_year]
+        return [(str(self.dates[i]), float(self.bars["close"][i])) for i in last_of_year[::-1]]
+
+    def year_end_closes(self, since_year=None):
+        """{year: last close of that year}, newest first."""
+        return {int(day[:4]): close for day, close in self.year_end_sessions(since_year)}
+
+    def pct_change(self, start, end):
+        before, after = self.close_on(start), self.close_on(end)
+        if not before or after is None:
+            return None
+        return (after - before) / before * 100
+
+    def range_summary(self, start, end):
+        """Open/close/high/low/average close over [start, end], or None if no sessions fall in it."""
+        window = self._slice(start, end)
+        if not len(window):
+            return None
+        return {
+            "start": str(window["date"][0]),
+            "end": str(window["date"][-1]),
+            "open": float(window["open"][0]),
+            "close": float(window["close"][-1]),
+            "high": float(window["high"].max()),
+            "low": float(window["low"].min()),
+            "average_close": float(window["close"].mean()),
+            "sessions": int(len(window)),
+        }
+
+    def period_summary(self, period_text):
+        """range_summary for a year, month or day, e.g. '2023-03' for "in March 2023"."""
+        return self.range_summary(*parse_period(period_text))
+
+
+def _frame_to_bars(frame):
+    frame = frame.dropna(subset=["Close"])
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars["date"] = frame.index.strftime("%Y-%m-%d").to_numpy().astype("datetime64[D]")
+    for field, column in (("open", "Open"), ("high", "High"), ("low", "Low"),
+                          ("close", "Close"), ("volume", "Volume")):
+        bars[field] = frame[column].to_numpy(dtype="f8")
+    return bars
+
+
+def _read(ticker):
+    try:
+        return np.load(_path(ticker), mmap_mode="r")
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write(ticker, bars):
+    os.makedirs(PRICE_STORE_DIR, exist_ok=True)
+    path = _path(ticker)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        np.save(handle, bars)
+    os.replace(tmp_path, path)  # atomic, so concurrent readers never see a partial file
+
+
+def merge_bars(ticker, frame):
+    """Merges a yfinance OHLCV frame into the store; newer bars replace overlapping dates."""
+    new_bars = _frame_to_bars(frame)
+    existing = _read(ticker)
+    if existing is not None and len(existing):
+        keep = existing[existing["date"] < new_bars["date"][0]] if len(new_bars) else existing
+        new_bars = np.concatenate([np.asarray(keep), new_bars])
+    _write(ticker, new_bars)
+    _LAST_CHECKED[ticker.upper()] = time.monotonic()
+    return new_bars
+
+
+def _is_current(bars):
+    last_session = np.busday_offset(_to_day(date.today()), -1, roll="backward")
+    return len(bars) and bars["date"][-1] >= last_session
+
+
+def load_prices(ticker, refresh=True):
+    """
+    Returns a PriceSeries for `ticker`, downloading only the dates missing since
+    the last stored bar. Returns None if no bars exist for the ticker.
+    """
+    ticker = ticker.upper()
+    bars = _read(ticker)
+
+    checked_at = _LAST_CHECKED.get(ticker)
+    recently_checked = checked_at is not None and time.monotonic() - checked_at < REFRESH_SECONDS
+    if refresh and not recently_checked and (bars is None or not _is_current(bars)):
+        STORE_STATS["refreshes"] += 1
+        from src.replay import open_ticker  # yfinance is only needed when the store is stale
+
+        stock = open_ticker(ticker)
+        if bars is None or not len(bars):
+            window = {"period": INITIAL_PERIOD}
+        else:
+            # Re-fetch the last stored day as well: it may have been a partial session.
+            window = {"start": str(bars["date"][-1])}
+        try:
+            with span("yfinance.fetch", endpoint="history") as s:
+                frame = call_provider("yfinance", stock.history, span=s, auto_adjust=True, **window)
+                s.payload(frame)
+        except TransientError as e:
+            if bars is None or not len(bars):
+                raise
+            # Stale bars beat no answer; the next lookup tries the refresh again.
+            STORE_STATS["stale_reads"] += 1
+            logger.warning("Price store: refresh of %s failed, serving stored bars: %s", ticker, e)
+        else:
+            STORE_STATS["bars_downloaded"] += len(frame)
+            if len(frame):
+                merge_bars(ticker, frame)
+                bars = _read(ticker)
+            _LAST_CHECKED[ticker] = time.monotonic()
+    else:
+        STORE_STATS["local_reads"] += 1
+
+    if bars is None or not len(bars):
+        return None
+    return PriceSeries(ticker, bars)
@@ -0,0 +1,95 @@
+import math
+from datetime import date
+from dataclasses import dataclass, field, asdict
+
+# ==============================================================================
+# STRUCTURED RESULTS
+# Providers return raw numbers with their unit, date and period so that
+# adjudication can compare values directly. The string view is only for display.
+# ==============================================================================
+# Units: "USD", "percent", "ratio", "shares", "count", "text"
+
+# Periods whose values are always shown with their date, even when there is only one.
+_DATED_PERIODS = {"FY", "Q", "year_end", "yoy", "qoq"}
+
+
+@dataclass(slots=True)
+class MetricValue:
+    label: str                  # e.g. "Trailing P/E", "Annual Revenue"
+    value: object               # float, int or str; None when the source has no value
+    unit: str
+    as_of: str = None           # ISO date the value refers to (period end for statements)
+    period: str = None          # "current", "FY", "Q", "ttm", "forward", "52w", "year_end", ...
+
+
+@dataclass(slots=True)
+class MetricResult:
+    ticker: str
+    metric_key: str
+    values: list
+    source: str = "yfinance"
+    fetched_at: str = field(default_factory=lambda: date.today().isoformat())
+
+    def __bool__(self):
+        return any(v.value is not None for v in self.values)
+
+    def __str__(self):
+        return self.render()
+
+    def find(self, label=None, period=None):
+        """Values matching `label` and/or `period`, newest first as the provider ordered them."""
+        return [v for v in self.values
+                if (label is None or v.label == label) and (period is None or v.period == period)]
+
+    def first(self, label=None, period=None):
+        matches = self.find(label, period)
+        return matches[0] if matches else None
+
+    def numbers(self):
+        return [v for v in self.values if isinstance(v.value, (int, float)) and not isinstance(v.value, bool)]
+
+    def to_dict(self):
+        return asdict(self)
+
+    def render(self):
+        """The human-readable view, e.g. "Annual Revenue: [2024-12-31: $96.77B, ...] | Quarterly ..."."""
+        groups = {}
+        for v in self.values:
+            groups.setdefault(v.label, []).append(v)
+
+        parts = []
+        for label, values in groups.items():
+            if len(values) == 1 and values[0].period not in _DATED_PERIODS:
+                suffix = " (Current)" if values[0].period == "current" else ""
+                parts.append(f"{label}: {format_value(values[0].value, values[0].unit)}{suffix}")
+            else:
+                series = ", ".join(f"{v.as_of}: {format_value(v.value, v.unit)}" for v in values)
+                parts.append(f"{label}: [{series}]")
+        return " | ".join(parts)
+
+
+def clean_number(value):
+    """Floats from pandas/yfinance with NaN, 'N/A' or None all become None."""
+    if value is None or isinstance(value, str):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def format_value(value, unit):
+    if value is None:
+        return "N/A"
+    if unit == "USD":
+        return f"${value / 1e9:.2f}B" if abs(value) >= 1e9 else f"${value:,.2f}"
+    if unit == "percent":
+        return f"{value:.2f}%"
+    if unit == "ratio":
+        return f"{value:.2f}"
+    if unit == "shares":
+        return f"{int(value):,} shares"
+    if unit == "count":
+        return f"{int(value):,}"
+    return str(value)
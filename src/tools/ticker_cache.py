@@ -0,0 +1,140 @@
+import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from src.replay import open_ticker
+from src.telemetry import span, count
+from src.resilience import call_provider, time_left, TransientError, DeadlineExceeded
+
+# ==============================================================================
+# TICKER SNAPSHOT CACHE
+# One process-wide snapshot per ticker. Each yfinance endpoint is fetched lazily
+# the first time a metric needs it and kept for its own TTL tier. A fetch only
+# holds up callers of the same endpoint, who share its result; cache hits and
+# other endpoints of the ticker never wait behind it.
+# ==============================================================================
+ENDPOINT_TTLS = {
+    "fast_info": 15,                      # price / volume / market cap move every tick
+    "info": 6 * 60 * 60,                  # ratios, ratings, profile
+    "financials": 24 * 60 * 60,           # statements only change on filings
+    "quarterly_financials": 24 * 60 * 60,
+    "balance_sheet": 24 * 60 * 60,
+    "quarterly_balance_sheet": 24 * 60 * 60,
+}
+NEGATIVE_TTL = 6 * 60 * 60               # unknown / delisted tickers
+
+CACHE_STATS = {"hits": 0, "misses": 0, "coalesced": 0, "negative_hits": 0, "errors": 0}
+
+_SNAPSHOTS = {}
+_UNKNOWN_TICKERS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+class TickerSnapshot:
+    """Lazily fetched, TTL-bounded view of one yf.Ticker."""
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self._stock = open_ticker(ticker)
+        self._entries = {}
+        self._in_flight = {}    # entry key -> Future of the fetch under way
+        self._lock = threading.Lock()
+
+    def _cached(self, entry_key, ttl, fetch):
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry and time.monotonic() - entry[0] < ttl:
+                CACHE_STATS["hits"] += 1
+                count("yfinance.snapshot_hits", endpoint=entry_key[0])
+                return entry[1]
+            pending = self._in_flight.get(entry_key)
+            if pending is None:
+                pending = self._in_flight[entry_key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Someone is fetching this endpoint already: wait for their result, within our own deadline.
+            CACHE_STATS["coalesced"] += 1
+            try:
+                return pending.result(timeout=time_left())
+            except FutureTimeout:
+                raise DeadlineExceeded("yfinance") from None
+
+        CACHE_STATS["misses"] += 1
+        try:
+            with span("yfinance.fetch", endpoint=entry_key[0]) as s:
+                value = call_provider("yfinance", fetch, span=s)
+                s.payload(value)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[entry_key]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[entry_key] = (time.monotonic(), value)
+            del self._in_flight[entry_key]
+        pending.set_result(value)
+        return value
+
+    def fast(self, field):
+        """A single fast_info field, e.g. 'last_price', 'market_cap', 'last_volume'."""
+        return self._cached(("fast_info", field), ENDPOINT_TTLS["fast_info"],
+                            lambda: self._stock.fast_info[field])
+
+    def get(self, endpoint):
+        """A whole endpoint: 'info' or a statement such as 'financials' or 'quarterly_balance_sheet'."""
+        return self._cached((endpoint,), ENDPOINT_TTLS[endpoint],
+                            lambda: getattr(self._stock, endpoint))
+
+
+def get_snapshot(ticker):
+    """
+    Returns the cached TickerSnapshot for `ticker`, or None if the ticker is unknown.
+    The first access probes fast_info['last_price']; permanent failures are negatively
+    cached, transient ones (Yahoo unreachable or throttling) raise TransientError.
+    Daily bars are not kept here: they live in the local price store (price_store.py).
+    """
+    ticker = ticker.upper()
+
+    with _REGISTRY_LOCK:
+        failed_at = _UNKNOWN_TICKERS.get(ticker)
+        if failed_at is not None:
+            if time.monotonic() - failed_at < NEGATIVE_TTL:
+                CACHE_STATS["negative_hits"] += 1
+                return None
+            del _UNKNOWN_TICKERS[ticker]
+
+        snapshot = _SNAPSHOTS.get(ticker)
+        if snapshot is None:
+            snapshot = _SNAPSHOTS[ticker] = TickerSnapshot(ticker)
+
+    try:
+        snapshot.fast("last_price")
+    except TransientError:
+        CACHE_STATS["errors"] += 1
+        raise
+    except Exception:
+        CACHE_STATS["errors"] += 1
+        with _REGISTRY_LOCK:
+            _UNKNOWN_TICKERS[ticker] = time.monotonic()
+            _SNAPSHOTS.pop(ticker, None)
+        return None
+
+    return snapshot
+
+
+def get_cache_stats():
+    lookups = CACHE_STATS["hits"] + CACHE_STATS["misses"]
+    return {
+        **CACHE_STATS,
+        "hit_rate": round(CACHE_STATS["hits"] / lookups, 3) if lookups else 0.0,
+        "tickers": len(_SNAPSHOTS),
+        "unknown_tickers": len(_UNKNOWN_TICKERS),
+    }
+
+
+def clear_cache():
+    with _REGISTRY_LOCK:
+        _SNAPSHOTS.clear()
+        _UNKNOWN_TICKERS.clear()
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import fcntl
+import hashlib
+import threading
+import numpy as np
+from contextlib import contextmanager
+
+# ==============================================================================
+# LOCAL VECTOR INDEX
+# Unit-length embeddings of verified claims and web snippets, kept as
+# structured .npy files (key, kind, expiry, vector) and read back memory-mapped.
+# Each add writes its rows as a small append-only shard; once MAX_SHARDS pile
+# up they are merged into vectors.npy without the expired rows, and the
+# entries of dropped rows leave entries.jsonl with them. A search is one
+# matrix-vector product per file over the rows of the requested kind. The text
+# and verdict of each row live in entries.jsonl keyed by the row key. Writers
+# (threads and batch worker processes alike) hold an exclusive lock on
+# index.lock and re-read the index under it; readers take it shared, so they
+# never see a half-finished compaction.
+# ==============================================================================
+VECTOR_INDEX_DIR = os.getenv("FACT_ENGINE_VECTOR_INDEX", os.path.join(".cache", "vectors"))
+
+KINDS = {"claim": 1, "snippet": 2}
+
+MAX_SHARDS = 16     # appended shards merged into vectors.npy beyond this
+
+VECTOR_STATS = {"searches": 0, "added": 0, "compactions": 0}
+
+_BASE = "vectors.npy"
+
+
+def text_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def normalize(vectors):
+    """Rows scaled to unit length (zero rows stay zero), as float32."""
+    vectors = np.asarray(vectors, dtype="f4")
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _is_part(name):
+    return name == _BASE or (name.startswith("shard-") and name.endswith(".npy"))
+
+
+class VectorIndex:
+    """One embedding model's index in `directory`. Safe to share between threads and processes."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._meta_path = os.path.join(directory, "entries.jsonl")
+        self._lock_path = os.path.join(directory, "index.lock")
+        self._parts = {}            # file name -> memory-mapped rows
+        self._versions = {}         # file name -> (inode, mtime, size) it was mapped at
+        self._row_of = {}           # key -> (file name, row)
+        self._meta = {}
+        self._meta_inode = None
+        self._meta_offset = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return sum(len(rows) for rows in self._parts.values())
+
+    @staticmethod
+    def _dtype(dim):
+        return np.dtype([("key", "S32"), ("kind", "u1"), ("expires", "f8"), ("vector", "f4", (dim,))])
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._lock_path, "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield   # closing the handle releases the lock
+
+    def _refresh(self):
+        """Picks up what changed on disk (our own writes or another process's)."""
+        if os.path.isdir(self.directory):
+            with self._file_lock(exclusive=False):
+                self._load()
+
+    def _load(self):
+        """Maps new or replaced parts and reads new entries. Callers hold the file lock."""
+        versions = {}
+        for name in os.listdir(self.directory):
+            if _is_part(name):
+                stat = os.stat(os.path.join(self.directory, name))
+                versions[name] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if versions != self._versions:
+            unchanged = {name for name, version in versions.items() if self._versions.get(name) == version}
+            rebuild = len(unchanged) < len(self._versions)   # a part was replaced or merged away
+            for name in sorted(versions):
+                if name not in unchanged:
+                    self._parts[name] = np.load(os.path.join(self.directory, name), mmap_mode="r")
+            self._parts = {name: self._parts[name] for name in sorted(versions)}
+            if rebuild:
+                self._row_of = {}
+            for name, rows in self._parts.items():
+                if rebuild or name not in unchanged:
+                    self._row_of.update({key.decode(): (name, row) for row, key in enumerate(rows["key"])})
+            self._versions = versions
+
+        try:
+            with open(self._meta_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != self._meta_inode or stat.st_size < self._meta_offset:
+                    # First read, or compacted since: start over.
+                    self._meta, self._meta_offset, self._meta_inode = {}, 0, stat.st_ino
+                f.seek(self._meta_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break   # a line still being written
+                    self._meta_offset += len(line)
+                    entry = json.loads(line)
+                    self._meta[entry["key"]] = entry
+        except FileNotFoundError:
+            pass
+
+    def vectors(self, keys):
+        """{key: vector} for the keys already in the index."""
+        with self._lock:
+            self._refresh()
+            found = {key: self._row_of[key] for key in keys if key in self._row_of}
+            return {key: np.array(self._parts[name]["vector"][row]) for key, (name, row) in found.items()}
+
+    def search(self, vector, kind, k=5, min_score=0.0):
+        """[(cosine similarity, entry)] of the `k` closest unexpired rows of `kind`, best first."""
+        with self._lock:
+            self._refresh()
+            parts, meta = list(self._parts.values()), self._meta
+        VECTOR_STATS["searches"] += 1
+
+        query, now = normalize(vector), time.time()
+        scores, keys = [], []
+        for rows in parts:
+            candidates = np.flatnonzero((rows["kind"] == KINDS[kind]) & (rows["expires"] > now))
+            if not len(candidates):
+                continue
+            part_scores = rows["vector"][candidates] @ query
+            keep = part_scores >= min_score
+            candidates, part_scores = candidates[keep], part_scores[keep]
+            if len(part_scores) > k:
+                top = np.argpartition(-part_scores, k)[:k]
+                candidates, part_scores = candidates[top], part_scores[top]
+            scores.append(part_scores)
+            keys.append(rows["key"][candidates])
+        if not scores:
+            return []
+
+        scores, keys = np.concatenate(scores), np.concatenate(keys)
+        hits = []
+        for i in np.argsort(-scores)[:k]:
+            entry = meta.get(keys[i].decode())
+            if entry is not None:
+                hits.append((float(scores[i]), entry))
+        return hits
+
+    def add(self, items):
+        """
+        Adds [(text, kind, ttl seconds, vector, metadata dict)] as a new shard. Texts already
+        indexed (by any process) are skipped.
+        """
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+            fresh = {}
+            for text, kind, ttl, vector, metadata in items:
+                key = text_key(text)
+                if key not in self._row_of and key not in fresh:
+                    fresh[key] = (kind, ttl, vector, {**metadata, "key": key, "kind": kind, "text": text})
+            if not fresh:
+                return 0
+
+            dim = len(next(iter(fresh.values()))[2])
+            new_rows = np.empty(len(fresh), dtype=self._dtype(dim))
+            now = time.time()
+            for i, (key, (kind, ttl, vector, _)) in enumerate(fresh.items()):
+                new_rows[i] = (key.encode(), KINDS[kind], now + ttl, normalize(vector))
+
+            # Metadata first: a row is only ever visible once its entry exists.
+            with open(self._meta_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(entry, default=str) + "\n" for *_, entry in fresh.values()))
+            self._save(f"shard-{time.time_ns()}-{os.getpid()}.npy", new_rows)
+            self._load()
+            if len(self._parts) - (_BASE in self._parts) > MAX_SHARDS:
+                self._compact()
+
+        VECTOR_STATS["added"] += len(fresh)
+        return len(fresh)
+
+    def _save(self, name, rows):
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.save(handle, rows)
+        os.replace(tmp_path, path)  # atomic, so readers never see a partial file
+
+    def _compact(self):
+        """Merges all parts into vectors.npy without expired rows and drops their entries. Holds the file lock."""
+        merged = np.concatenate([np.asarray(rows) for rows in self._parts.values()])
+        merged = merged[merged["expires"] > time.time()]
+        self._save(_BASE, merged)
+        for name in self._parts:
+            if name != _BASE:
+                os.remove(os.path.join(self.directory, name))
+
+        live = {key.decode() for key in merged["key"]}
+        tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry, default=str) + "\n" for key, entry in self._meta.items() if key in live)
+        os.replace(tmp_path, self._meta_path)
+        self._load()
+        VECTOR_STATS["compactions"] += 1
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_vector_index(name):
+    """The process-wide index stored under VECTOR_INDEX_DIR/<name> (e.g. the embedding model)."""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(name)
+        if index is None:
+            index = _INDEXES[name] = VectorIndex(os.path.join(VECTOR_INDEX_DIR, name))
+    return index
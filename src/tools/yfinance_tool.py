@@ -1,62 +1,306 @@
-import os
-import yfinance as yf
-from openai import OpenAI
-from dotenv import load_dotenv
+import re
+import math
+import logging
+import contextvars
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from src.cache import cached_call
+from src.config import get_openai_client
+from src.telemetry import span, setup_logging
+from src.resilience import call_provider, TransientError
+from src.tools.ticker_cache import get_snapshot, get_cache_stats
+from src.tools.results import MetricResult, MetricValue, clean_number
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# ATTRIBUTE MAPPING
+# Tier 1: keyword/synonym rules. Tier 2: TF-IDF nearest neighbour over the
+# synonym lists. Tier 3: the LLM, only when the local tiers are not confident.
+# ==============================================================================
+METRIC_SYNONYMS = {
+    "price": ["price", "stock price", "share price", "current price", "value", "trading",
+              "trading for", "trading at", "quote", "stock worth", "shares worth"],
+    "historical_price": ["price history", "historical price", "stock history", "past price",
+                         "price performance"],
+    "market_cap": ["market cap", "market capitalization", "valuation", "market value", "cap",
+                   "company worth", "company valued", "firm worth"],
+    "pe_ratio": ["p/e", "pe", "pe ratio", "p/e ratio", "price to earnings", "price-to-earnings",
+                 "earnings multiple", "relative to earnings"],
+    "dividend_yield": ["dividend", "dividends", "dividend yield", "yield", "payout"],
+    "volume": ["volume", "trading volume", "shares traded"],
+    "high_low": ["52 week high", "52 week low", "52-week high", "52-week low", "52 week",
+                 "52-week", "range", "trading range", "year high", "year low"],
+    "company_info": ["sector", "industry", "what do they do", "what does this company do",
+                     "profile", "employees", "headcount", "business"],
+    "financial_health": ["cash", "debt", "balance sheet", "safe", "liabilities", "leverage",
+                         "solvent", "solvency"],
+    "analyst_rating": ["buy or sell", "rating", "ratings", "recommendation", "target price",
+                       "price target", "analyst", "analysts", "upgrade", "downgrade"],
+    "total_revenue": ["sales", "revenue", "revenues", "income", "top line", "turnover",
+                      "how much money do they make"],
+    "net_income": ["profit", "profits", "earnings", "net profit", "net income", "profitable",
+                   "losing money", "bottom line", "net loss"],
+    "future_estimates": ["forecast", "projected", "projected revenue", "projection", "future growth",
+                         "estimates", "estimate", "next year", "guidance", "outlook"],
+    "unknown": ["ceo", "founder", "news", "headlines", "competitors", "competitor", "lawsuit"],
+}
+METRIC_KEYS = list(METRIC_SYNONYMS)
+
+MAPPER_MODEL = "gpt-4o-mini"
+RULE_CONFIDENCE_THRESHOLD = 0.7
+NEAREST_SIMILARITY_THRESHOLD = 0.45
+NEAREST_MARGIN = 0.1
+
+# Lookups served per tier ("cache" counts repeated LLM answers).
+MAPPER_STATS = {"cache": 0, "rules": 0, "nearest": 0, "llm": 0}
+_LLM_MAPPING_CACHE = {}
+
+_MONTHS = ("january|february|march|april|may|june|july|august|september|"
+           "october|november|december|sept")
+_PAST_TIME_PATTERN = re.compile(
+    r"\b(?:19|20)\d{2}\b"
+    rf"|\b(?:{_MONTHS})\b"
+    r"|\blast (?:\d+ )?(?:year|years|month|months|quarter|quarters|week|weeks)\b"
+    r"|\b(?:history|historical|historically|past|ago|previous|previously)\b"
+)
+_TIME_SENSITIVE_KEYS = {"price": "historical_price"}
+_STOPWORDS = {"what", "is", "the", "a", "an", "of", "for", "do", "does", "they", "their", "it",
+              "its", "how", "much", "are", "was", "were", "in", "on", "to", "this", "that",
+              "me", "show", "have", "has", "which", "and", "or", "about", "current", "?",
+              "who", "them", "there", "be", "did", "at", "by", "with", "latest", "today", "near",
+              "stock", "lot", "think"}
+# Words that qualify a metric (when, how often, which variant, as a change) without naming it.
+# They are left to the time rules and the adjudicator, so they neither count
+# for nor against a match.
+_QUALIFIER_PATTERN = re.compile(
+    rf"^(?:\d+|q[1-4]|h[12]|fy\d*|{_MONTHS}|last|next|past|ago|year|years|yearly|annual|annually|"
+    r"quarter|quarters|quarterly|month|months|week|weeks|end|ending|close|closing|"
+    r"total|trailing|forward|ttm|growth|yoy|qoq)$"
+)
+
+
+def _normalize_attribute(attribute_text):
+    return " ".join(re.findall(r"[a-z0-9/\-]+", attribute_text.lower()))
+
+
+def _content_tokens(normalized_text):
+    """(start, end) of each word that names what is asked for (no stopwords or qualifiers)."""
+    return [match.span() for match in re.finditer(r"[a-z0-9/]+", normalized_text)
+            if match.group() not in _STOPWORDS and not _QUALIFIER_PATTERN.match(match.group())]
+
+
+def _tokenize(text):
+    tokens = []
+    for token in re.findall(r"[a-z0-9/]+", text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _mentions_past_time(normalized_text):
+    return bool(_PAST_TIME_PATTERN.search(normalized_text))
+
+
+def _apply_time_rules(metric_key, normalized_text):
+    """PRIORITY RULE 1 of the prompt: a past time turns current-price questions into history."""
+    if metric_key in _TIME_SENSITIVE_KEYS and _mentions_past_time(normalized_text):
+        return _TIME_SENSITIVE_KEYS[metric_key]
+    return metric_key
+
+
+# Longest phrases first, so "trading volume" claims its span before "trading" can.
+_SYNONYM_PATTERNS = sorted(
+    ((len(phrase.split()), key, re.compile(rf"(?<![a-z0-9]){re.escape(phrase)}(?![a-z0-9])"))
+     for key, phrases in METRIC_SYNONYMS.items() for phrase in phrases),
+    key=lambda item: -item[0],
+)
+
+
+def _rule_based_key(normalized_text):
+    """
+    Tier 1. Returns (metric_key, confidence) from non-overlapping synonym matches.
+    Confidence is the winning key's share of the matches, scaled by the share of
+    the phrase's content words they cover: "operating income" only matches on
+    "income", so it is left to the later tiers.
+    """
+    taken = []
+    scores = {}
+    for weight, key, pattern in _SYNONYM_PATTERNS:
+        for match in pattern.finditer(normalized_text):
+            start, end = match.span()
+            if any(start < t_end and t_start < end for t_start, t_end in taken):
+                continue
+            taken.append((start, end))
+            scores[key] = scores.get(key, 0) + weight
+
+    if not scores:
+        return None, 0.0
+
+    best_key = max(scores, key=scores.get)
+    words = _content_tokens(normalized_text)
+    covered = sum(any(t_start <= start and end <= t_end for t_start, t_end in taken) for start, end in words)
+    coverage = covered / len(words) if words else 1.0
+    confidence = scores[best_key] / sum(scores.values()) * coverage
+    return best_key, confidence
+
+
+def _build_synonym_index():
+    documents = {key: _tokenize(" ".join(phrases)) for key, phrases in METRIC_SYNONYMS.items()}
+    doc_freq = {}
+    for tokens in documents.values():
+        for token in set(tokens):
+            doc_freq[token] = doc_freq.get(token, 0) + 1
+
+    idf = {token: math.log((1 + len(documents)) / (1 + df)) + 1 for token, df in doc_freq.items()}
+    vectors = {}
+    for key, tokens in documents.items():
+        vector = {}
+        for token in tokens:
+            vector[token] = vector.get(token, 0.0) + idf[token]
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        vectors[key] = {token: v / norm for token, v in vector.items()}
+    return idf, vectors
+
+
+_SYNONYM_IDF, _SYNONYM_VECTORS = _build_synonym_index()
+_UNSEEN_IDF = math.log(1 + len(METRIC_SYNONYMS)) + 1
+
+
+def _nearest_neighbour_key(normalized_text):
+    """
+    Tier 2. Returns (metric_key, cosine similarity, margin over the runner-up).
+    Words outside the synonym vocabulary still weigh in the query's norm (at the
+    rarest-word IDF), so a phrase the synonyms only partly explain stays dissimilar.
+    """
+    query = {}
+    for token in _tokenize(normalized_text):
+        if _QUALIFIER_PATTERN.match(token):
+            continue
+        query[token] = query.get(token, 0.0) + _SYNONYM_IDF.get(token, _UNSEEN_IDF)
+    norm = math.sqrt(sum(v * v for v in query.values()))
+    if not any(token in _SYNONYM_IDF for token in query):
+        return None, 0.0, 0.0
+
+    similarities = sorted(
+        ((sum(weight * vector.get(token, 0.0) for token, weight in query.items()) / norm, key)
+         for key, vector in _SYNONYM_VECTORS.items()),
+        reverse=True,
+    )
+    (best, best_key), (runner_up, _) = similarities[0], similarities[1]
+    return best_key, best, best - runner_up
+
+
+MAPPER_SYSTEM_PROMPT = """
+You are a financial attribute mapper. Map user text to these exact keys:
+
+### PRIORITY RULES (Follow in Order):
+1. ⚠️ **TIME CHECK**: Does the user mention a specific year (e.g., "2021", "2023"), a month ("March"), or words like "last year", "history", "past"? 
+   -> If YES, and they want price, YOU MUST RETURN "historical_price".
+   -> If YES, and they want revenue/income, YOU MUST RETURN "total_revenue" or "net_income".
+
+2. **TOPIC CHECK**: If no specific past time is mentioned, MATCH THE TEXT TO THE LIST BELOW AND LOOK AT SYNONYMS.
+   (e.g., "profitable" -> "net_income", "debt" -> "financial_health")
+
+[
+  "price",          (Synonyms: "stock", "stock price", "current price", "value", "trading")
+  "historical_price", (Synonyms: "price in 2022", "value last year", "price history")
+  "market_cap",     (Current Only. Synonyms: "valuation", "market value", "cap")
+  "pe_ratio",       (Current Only. Synonyms: "p/e", "price to earnings")
+  "dividend_yield", (Current Only. Synonyms: "dividend", "yield", "payout")
+  "volume",         (Current Only. Synonyms: "trading volume", "shares traded")
+  "high_low",       (Current Only. Synonyms: "52 week high", "52 week low", "range")
+  "company_info",   (Synonyms: "sector", "industry", "what do they do", "profile", "employees")
+  "financial_health", (Synonyms: "cash", "debt", "balance sheet", "safe", "liabilities")
+  "analyst_rating",   (Synonyms: "buy or sell", "rating", "recommendation", "target price")
+  "total_revenue",  (Current AND Historical. Synonyms: "sales", "revenue", "income", "how much money do they make")
+  "net_income",     (Current AND Historical. Synonyms: "profit", "earnings", "net profit", "net income", "profitable", "losing money")
+  "future_estimates", (Synonyms: "forecast", "projected revenue", "future growth", "estimates", "next year")
+  "unknown"
+]
+RETURN ONLY THE KEY NAME.
+"""
+
+
+def _llm_map_attribute(attribute_text):
+    def _call_llm():
+        with span("openai.chat", agent="mapper", model=MAPPER_MODEL) as s:
+            response = call_provider(
+                "openai", get_openai_client().chat.completions.create, span=s,
+                model=MAPPER_MODEL,
+                messages=[
+                    {"role": "system", "content": MAPPER_SYSTEM_PROMPT},
+                    {"role": "user", "content": attribute_text}
+                ],
+                temperature=0
+            )
+            s.usage(response)
+        return response.choices[0].message.content.strip().strip('"').lower()
+
+    key_parts = {"model": MAPPER_MODEL, "prompt": MAPPER_SYSTEM_PROMPT, "input": attribute_text}
+    metric_key = cached_call("yfinance.attribute_key", key_parts, _call_llm)
+    return metric_key if metric_key in METRIC_KEYS else "unknown"
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def _map_attribute_to_yfinance_key(attribute_text):
-    system_prompt = """
-    You are a financial attribute mapper. Map user text to these exact keys:
+    normalized = _normalize_attribute(attribute_text)
 
-    ### PRIORITY RULES (Follow in Order):
-    1. ⚠️ **TIME CHECK**: Does the user mention a specific year (e.g., "2021", "2023"), a month ("March"), or words like "last year", "history", "past"? 
-       -> If YES, and they want price, YOU MUST RETURN "historical_price".
-       -> If YES, and they want revenue/income, YOU MUST RETURN "total_revenue" or "net_income".
-    
-    2. **TOPIC CHECK**: If no specific past time is mentioned, MATCH THE TEXT TO THE LIST BELOW AND LOOK AT SYNONYMS.
-       (e.g., "profitable" -> "net_income", "debt" -> "financial_health")
-
-    [
-      "price",          (Synonyms: "stock", "stock price", "current price", "value", "trading")
-      "historical_price", (Synonyms: "price in 2022", "value last year", "price history")
-      "market_cap",     (Current Only. Synonyms: "valuation", "market value", "cap")
-      "pe_ratio",       (Current Only. Synonyms: "p/e", "price to earnings")
-      "dividend_yield", (Current Only. Synonyms: "dividend", "yield", "payout")
-      "volume",         (Current Only. Synonyms: "trading volume", "shares traded")
-      "high_low",       (Current Only. Synonyms: "52 week high", "52 week low", "range")
-      "company_info",   (Synonyms: "sector", "industry", "what do they do", "profile", "employees")
-      "financial_health", (Synonyms: "cash", "debt", "balance sheet", "safe", "liabilities")
-      "analyst_rating",   (Synonyms: "buy or sell", "rating", "recommendation", "target price")
-      "total_revenue",  (Current AND Historical. Synonyms: "sales", "revenue", "income", "how much money do they make")
-      "net_income",     (Current AND Historical. Synonyms: "profit", "earnings", "net profit", "net income", "profitable", "losing money")
-      "future_estimates", (Synonyms: "forecast", "projected revenue", "future growth", "estimates", "next year")
-      "unknown"
-    ]
-    RETURN ONLY THE KEY NAME.
-    """
-    
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": attribute_text}
-        ],
-        temperature=0
-    )
-    return response.choices[0].message.content.strip().lower()
+    metric_key, confidence = _rule_based_key(normalized)
+    if metric_key and confidence >= RULE_CONFIDENCE_THRESHOLD:
+        MAPPER_STATS["rules"] += 1
+        return _apply_time_rules(metric_key, normalized)
 
-def _format_series(series, label):
-    """Helper to turn a pandas series into a readable string."""
-    try:
-        series = series.sort_index(ascending=False)
-        parts = []
-        for date, val in series.items():
-            parts.append(f"{date.strftime('%Y-%m-%d')}: ${round(val/1e9, 2)}B")
-        return f"{label}: [{', '.join(parts)}]"
-    except Exception:
-        return ""
+    metric_key, similarity, margin = _nearest_neighbour_key(normalized)
+    if metric_key and similarity >= NEAREST_SIMILARITY_THRESHOLD and margin >= NEAREST_MARGIN:
+        MAPPER_STATS["nearest"] += 1
+        return _apply_time_rules(metric_key, normalized)
+
+    if normalized in _LLM_MAPPING_CACHE:
+        MAPPER_STATS["cache"] += 1
+        return _LLM_MAPPING_CACHE[normalized]
+
+    MAPPER_STATS["llm"] += 1
+    metric_key = _llm_map_attribute(attribute_text)
+    _LLM_MAPPING_CACHE[normalized] = metric_key
+    return metric_key
+
+
+# Public name for other agents; the private one is kept for the demos below.
+map_attribute_to_metric_key = _map_attribute_to_yfinance_key
+
+
+def get_mapper_stats():
+    """How many attribute lookups each tier served, plus the share kept off the LLM."""
+    total = sum(MAPPER_STATS.values())
+    local = total - MAPPER_STATS["llm"]
+    return {**MAPPER_STATS, "total": total, "local_ratio": round(local / total, 3) if total else 0.0}
+
+HISTORY_YEARS = 5   # year-end closes reported, counted back from the latest stored session
+
+def _price_history_values(prices):
+    # Anchored to the data rather than the clock, so the same bars always give the same evidence.
+    latest_year = int(str(prices.dates[-1])[:4])
+    sessions = prices.year_end_sessions(since_year=latest_year - HISTORY_YEARS)
+    return [MetricValue("Year-End Close", close, "USD", day, "year_end") for day, close in sessions]
+
+def _percent(value):
+    value = clean_number(value)
+    return None if value is None else value * 100
+
+# Metrics served (at least partly) from the heavy `stock.info` payload.
+_INFO_METRICS = {"volume", "dividend_yield", "high_low", "company_info", "analyst_rating"}
+
+# Metrics served from the per-ticker fundamentals index (statements + info, built once).
+_FUNDAMENTAL_METRICS = {"total_revenue", "net_income", "financial_health", "future_estimates", "pe_ratio"}
+# Statement metric -> (line item, label); the adjudicator reads exact periods back through it.
+STATEMENT_LINES = {"total_revenue": ("Total Revenue", "Revenue"), "net_income": ("Net Income", "Net Income")}
+_CASH_ITEMS = ("Cash Cash Equivalents And Short Term Investments", "Cash And Cash Equivalents")
+
+# Every metric key this tool can answer (what the DB agent routes on).
+SUPPORTED_METRICS = [key for key in METRIC_KEYS if key != "unknown"]
 
 def fetch_yfinance_data(ticker, attribute):
     metric_key = _map_attribute_to_yfinance_key(attribute)
@@ -64,88 +308,215 @@ def fetch_yfinance_data(ticker, attribute):
     if metric_key == "unknown":
         return None
 
-    stock = yf.Ticker(ticker)
-    
-    try:
-        _ = stock.fast_info['last_price']
-    except Exception:
-        print(f"[yfinance Tool] Error: Ticker '{ticker}' not found or delisted.")
+    return fetch_yfinance_metric(ticker, metric_key)
+
+def fetch_yfinance_metric(ticker, metric_key):
+    """
+    Same as fetch_yfinance_data, for callers that already resolved the metric key.
+    Returns None when Yahoo has no such data; raises TransientError when Yahoo could not be reached.
+    """
+    snapshot = get_snapshot(ticker)
+    if snapshot is None:
+        logger.warning("[yfinance Tool] Ticker '%s' not found or delisted.", ticker)
         return None
 
     try:
-        info = stock.fast_info
-        metadata = stock.info 
+        # Only pull the heavy `info` payload for metrics that read it.
+        metadata = snapshot.get("info") if metric_key in _INFO_METRICS else {}
+        if metric_key in _FUNDAMENTAL_METRICS:
+            from src.tools.fundamentals import load_fundamentals  # deferred: numpy/pandas
+            fundamentals = load_fundamentals(ticker)
+
+        today = date.today().isoformat()
+        values = None
 
         if metric_key == "price":
-            return f"${round(info['last_price'], 2)} (Current)"
+            values = [MetricValue("Price", clean_number(snapshot.fast('last_price')), "USD", today, "current")]
             
         elif metric_key == "market_cap":
-            return f"${round(info['market_cap'] / 1e9, 2)} Billion (Current)"
+            values = [MetricValue("Market Cap", clean_number(snapshot.fast('market_cap')), "USD", today, "current")]
         
         elif metric_key == "volume":
-            vol = "{:,}".format(int(info['last_volume']))
-            avg_vol = "{:,}".format(int(metadata.get('averageVolume10days', 0)))
-            return f"Volume: {vol} shares (Avg: {avg_vol})"
+            values = [
+                MetricValue("Volume", clean_number(snapshot.fast('last_volume')), "shares", today, "current"),
+                MetricValue("Avg Volume (10d)", clean_number(metadata.get('averageVolume10days')), "shares", today, "10d"),
+            ]
 
         # --- METADATA (Ratios & Info) ---
         elif metric_key == "pe_ratio":
-            return f"Trailing P/E: {metadata.get('trailingPE', 'N/A')} | Forward P/E: {metadata.get('forwardPE', 'N/A')}"
+            values = [
+                MetricValue("Trailing P/E", fundamentals.info['trailingPE'], "ratio", today, "ttm"),
+                MetricValue("Forward P/E", fundamentals.info['forwardPE'], "ratio", today, "forward"),
+            ]
             
         elif metric_key == "dividend_yield":
-            yield_val = metadata.get('dividendYield', 'N/A')
-            if yield_val != 'N/A':
-                yield_val = f"{round(yield_val * 100, 2)}%"
-            return f"Dividend Yield: {yield_val} (Payout Ratio: {round(metadata.get('payoutRatio', 0)*100, 2)}%)"
+            values = [
+                MetricValue("Dividend Yield", _percent(metadata.get('dividendYield')), "percent", today, "ttm"),
+                MetricValue("Payout Ratio", _percent(metadata.get('payoutRatio')), "percent", today, "ttm"),
+            ]
             
         elif metric_key == "high_low":
-            return f"52-Week High: ${metadata.get('fiftyTwoWeekHigh')} | Low: ${metadata.get('fiftyTwoWeekLow')}"
+            values = [
+                MetricValue("52-Week High", clean_number(metadata.get('fiftyTwoWeekHigh')), "USD", today, "52w"),
+                MetricValue("52-Week Low", clean_number(metadata.get('fiftyTwoWeekLow')), "USD", today, "52w"),
+            ]
             
         elif metric_key == "company_info":
-            return f"Sector: {metadata.get('sector')} | Industry: {metadata.get('industry')} | Employees: {metadata.get('fullTimeEmployees')}"
+            values = [
+                MetricValue("Sector", metadata.get('sector'), "text"),
+                MetricValue("Industry", metadata.get('industry'), "text"),
+                MetricValue("Employees", clean_number(metadata.get('fullTimeEmployees')), "count", today),
+            ]
 
         elif metric_key == "financial_health":
-            total_cash = metadata.get('totalCash', 0)
-            total_debt = metadata.get('totalDebt', 0)
-            cash_per_share = metadata.get('totalCashPerShare', 0)
-            return f"Total Cash: ${round(total_cash/1e9, 2)}B | Total Debt: ${round(total_debt/1e9, 2)}B | Cash per Share: ${cash_per_share}"
+            # The latest quarterly balance sheet, falling back to Yahoo's summary figures.
+            cash, cash_as_of = fundamentals.latest(_CASH_ITEMS)
+            debt, debt_as_of = fundamentals.latest(("Total Debt",))
+            values = [
+                MetricValue("Total Cash", cash if cash is not None else fundamentals.info['totalCash'], "USD",
+                            cash_as_of or today, "mrq"),
+                MetricValue("Total Debt", debt if debt is not None else fundamentals.info['totalDebt'], "USD",
+                            debt_as_of or today, "mrq"),
+                MetricValue("Cash per Share", fundamentals.info['totalCashPerShare'], "USD", today, "mrq"),
+            ]
 
         elif metric_key == "analyst_rating":
-            recommendation = metadata.get('recommendationKey', 'none').upper()
-            target_price = metadata.get('targetMeanPrice', 'N/A')
-            num_analysts = metadata.get('numberOfAnalystOpinions', 'N/A')
-            return f"Consensus: {recommendation} | Target Price: ${target_price} | Analysts: {num_analysts}"
+            recommendation = metadata.get('recommendationKey')
+            values = [
+                MetricValue("Consensus", recommendation.upper() if recommendation else None, "text", today),
+                MetricValue("Target Price", clean_number(metadata.get('targetMeanPrice')), "USD", today, "forward"),
+                MetricValue("Analysts", clean_number(metadata.get('numberOfAnalystOpinions')), "count", today),
+            ]
 
         # --- HISTORICAL DATA ---
         elif metric_key == "historical_price":
-            hist = stock.history(period="5y")
-            annual_close = hist['Close'].resample('YE').last().sort_index(ascending=False)
-            
-            parts = [f"Year-End {date.year}: ${round(price, 2)}" for date, price in annual_close.items()]
-            return f"Price History: [{', '.join(parts)}]"
-
-        elif metric_key == "total_revenue":
-            annual = stock.financials.loc['Total Revenue']
-            quarterly = stock.quarterly_financials.loc['Total Revenue']
-            return f"{_format_series(annual, 'Annual Revenue')} | {_format_series(quarterly, 'Quarterly Revenue')}"
-
-        elif metric_key == "net_income":
-            annual = stock.financials.loc['Net Income']
-            quarterly = stock.quarterly_financials.loc['Net Income']
-            return f"{_format_series(annual, 'Annual Net Income')} | {_format_series(quarterly, 'Quarterly Net Income')}"
+            # Served from the local price store; only missing days are downloaded.
+            from src.tools.price_store import load_prices
+            prices = load_prices(ticker)
+            values = _price_history_values(prices) if prices else None
+
+        elif metric_key in STATEMENT_LINES:
+            # Annual and quarterly values plus their YoY / QoQ growth, so "+5%" claims are checked directly.
+            values = fundamentals.statement_values(*STATEMENT_LINES[metric_key])
+
         # --- PROJECTED DATA ---
         elif metric_key == "future_estimates":
-            rev_growth = metadata.get('revenueGrowth', 'N/A')
-            earn_growth = metadata.get('earningsGrowth', 'N/A')
-            target_price = metadata.get('targetMeanPrice', 'N/A')
-            return f"Revenue Growth (YoY): {rev_growth} | Earnings Growth: {earn_growth} | Target Price: ${target_price}"
+            values = [
+                MetricValue("Revenue Growth (YoY)", _percent(fundamentals.info['revenueGrowth']), "percent", today, "yoy"),
+                MetricValue("Earnings Growth", _percent(fundamentals.info['earningsGrowth']), "percent", today, "yoy"),
+                MetricValue("Target Price", fundamentals.info['targetMeanPrice'], "USD", today, "forward"),
+            ]
+
+        if values:
+            return MetricResult(ticker.upper(), metric_key, values)
 
+    except TransientError:
+        raise
     except Exception as e:
-        print(f"      [yfinance Tool] Error processing {metric_key}: {e}")
+        logger.warning("[yfinance Tool] Error processing %s for %s: %s", metric_key, ticker, e)
         return None
     
     return None
 
+# ==============================================================================
+# BULK FETCH
+# Many (ticker, metric_key) requests at once: price/volume/history for every
+# ticker come from a single multi-ticker download, everything else shares one
+# snapshot per ticker, and repeated requests are only fetched once. Downloaded
+# history is merged into the local price store for later lookups.
+# ==============================================================================
+_DOWNLOAD_METRICS = {"price", "historical_price", "volume"}
+BULK_HISTORY_PERIOD = "5y"
+BULK_MAX_WORKERS = 8
+
+
+def _download_bars(tickers):
+    """One yf.download for all tickers. Returns {ticker: daily bars} for tickers that have data."""
+    from src.replay import download
+
+    with span("yfinance.fetch", endpoint="download") as s:
+        data = call_provider("yfinance", download, tickers, span=s, period=BULK_HISTORY_PERIOD,
+                             group_by="ticker", auto_adjust=True, threads=True, progress=False)
+        s.payload(data)
+    bars = {}
+    for ticker in tickers:
+        try:
+            frame = data[ticker] if data.columns.nlevels > 1 else data
+        except KeyError:
+            continue
+        frame = frame.dropna(how="all")
+        if not frame.empty:
+            bars[ticker] = frame
+    return bars
+
+
+def _metric_from_bars(ticker, frame, metric_key):
+    last_day = frame.index[-1].strftime('%Y-%m-%d')
+    if metric_key == "price":
+        values = [MetricValue("Price", clean_number(frame['Close'].iloc[-1]), "USD", last_day, "current")]
+    elif metric_key == "volume":
+        values = [
+            MetricValue("Volume", clean_number(frame['Volume'].iloc[-1]), "shares", last_day, "current"),
+            MetricValue("Avg Volume (10d)", clean_number(frame['Volume'].iloc[-10:].mean()), "shares", last_day, "10d"),
+        ]
+    else:
+        from src.tools.price_store import merge_bars, PriceSeries
+        values = _price_history_values(PriceSeries(ticker, merge_bars(ticker, frame)))
+    return MetricResult(ticker, metric_key, values)
+
+
+def fetch_yfinance_bulk(requests):
+    """
+    Input: A list of (ticker, metric_key) pairs
+    Output: A list of results aligned with the input (None where data is missing)
+    """
+    requests = [(ticker.upper(), metric_key) for ticker, metric_key in requests]
+    unique = list(dict.fromkeys(requests))
+    answers = {}
+
+    download_tickers = sorted({ticker for ticker, key in unique if key in _DOWNLOAD_METRICS})
+    if download_tickers:
+        logger.info("[yfinance Tool] Bulk download for %d tickers", len(download_tickers))
+        try:
+            bars = _download_bars(download_tickers)
+        except Exception as e:
+            logger.warning("[yfinance Tool] Bulk download failed, falling back per ticker: %s", e)
+            bars = {}
+
+        for ticker, key in unique:
+            if key in _DOWNLOAD_METRICS and ticker in bars:
+                try:
+                    answers[(ticker, key)] = _metric_from_bars(ticker, bars[ticker], key)
+                except Exception as e:
+                    logger.warning("[yfinance Tool] Error processing %s for %s: %s", key, ticker, e)
+
+    # Everything not answered by the download goes through the snapshot cache,
+    # one thread per ticker so a ticker's metrics share its endpoints.
+    remaining = {}
+    for ticker, key in unique:
+        if (ticker, key) not in answers:
+            remaining.setdefault(ticker, []).append(key)
+
+    def _fetch_ticker(ticker):
+        fetched = {}
+        for key in remaining[ticker]:
+            try:
+                fetched[(ticker, key)] = fetch_yfinance_metric(ticker, key)
+            except TransientError as e:
+                logger.warning("[yfinance Tool] %s for %s unavailable: %s", key, ticker, e)
+        return fetched
+
+    if remaining:
+        with ThreadPoolExecutor(max_workers=BULK_MAX_WORKERS) as pool:
+            # A copy of the caller's context per ticker, so its request deadline applies in the pool.
+            futures = [pool.submit(contextvars.copy_context().run, _fetch_ticker, ticker) for ticker in remaining]
+            for future in futures:
+                answers.update(future.result())
+
+    return [answers.get(request) for request in requests]
+
 if __name__ == "__main__":
+    setup_logging()
 
     print("\n--- 🧪 TEST SUITE: YFINANCE TOOL ---")
     
@@ -177,6 +548,17 @@ if __name__ == "__main__":
     # 7. ERROR HANDLING
     print("\n--- 7. Error Handling (Should be None) ---")
     print(fetch_yfinance_data("FAKE_TICKER_123", "price"))
+    print(fetch_yfinance_data("FAKE_TICKER_123", "market cap"))  # served by the negative cache
+
+    # 8. BULK FETCH
+    print("\n--- 8. Bulk Fetch (one download, aligned results) ---")
+    bulk_requests = [("MSFT", "price"), ("AAPL", "historical_price"), ("NVDA", "volume"),
+                     ("MSFT", "price"), ("AAPL", "pe_ratio"), ("FAKE_TICKER_123", "price")]
+    for request, result in zip(bulk_requests, fetch_yfinance_bulk(bulk_requests)):
+        print(f"{request}: {result}")
+
+    print("\n--- SNAPSHOT CACHE ---")
+    print(get_cache_stats())
 
 
     print("\n--- 🧪 TEST SUITE: ATTRIBUTE MAPPING ---")
@@ -231,4 +613,7 @@ if __name__ == "__main__":
     print("\n--- CATEGORY: UNKNOWN (Should Fail) ---")
     print(f"1. 'Who is the CEO?':             {_map_attribute_to_yfinance_key('Who is the CEO?')}")
     print(f"2. 'Latest news about them':      {_map_attribute_to_yfinance_key('Latest news about them')}")
-    print(f"3. 'Who are their competitors?':  {_map_attribute_to_yfinance_key('Who are their competitors?')}")
\ No newline at end of file
+    print(f"3. 'Who are their competitors?':  {_map_attribute_to_yfinance_key('Who are their competitors?')}")
+
+    print("\n--- MAPPER TIERS ---")
+    print(get_mapper_stats())
\ No newline at end of file
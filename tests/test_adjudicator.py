@@ -0,0 +1,164 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.agents.adjudicator import (check_numeric_claim, parse_claimed_value, parse_timeframe, states_value,
+                                  SUPPORTED, REFUTED, INCONCLUSIVE)
+from src.tools import fundamentals
+from src.tools.fundamentals import FundamentalsIndex
+from src.tools.results import MetricResult, MetricValue
+
+STATEMENTS = {
+    "financials": pd.DataFrame({"2024-12-31": [97.69e9], "2023-12-31": [96.77e9]}, index=["Total Revenue"]),
+    "quarterly_financials": pd.DataFrame(
+        {"2024-12-31": [25.71e9], "2024-09-30": [25.18e9], "2024-06-30": [25.50e9], "2024-03-31": [21.30e9]},
+        index=["Total Revenue"]),
+}
+
+
+class FakeSnapshot:
+    ticker = "TSLA"
+
+    def get(self, endpoint):
+        return STATEMENTS.get(endpoint)
+
+
+@pytest.fixture
+def revenue(monkeypatch):
+    """TSLA revenue evidence as yfinance_tool builds it, with its fundamentals index in memory."""
+    index = FundamentalsIndex(FakeSnapshot())
+    monkeypatch.setitem(fundamentals._INDEXES, "TSLA", (time.monotonic(), index))
+    return MetricResult("TSLA", "total_revenue", index.statement_values("Total Revenue", "Revenue"))
+
+
+def _claim(attribute, claimed_value):
+    return {"target": "Tesla", "ticker": "TSLA", "attribute": attribute, "claimed_value": claimed_value}
+
+
+def test_quarter_claim_is_not_matched_to_the_annual_value(revenue):
+    verdict = check_numeric_claim(_claim("Q4 2024 Revenue", "$97.7 Billion"), revenue)
+    assert verdict["verdict"] == REFUTED
+    assert verdict["actual"] == pytest.approx(25.71e9)
+
+
+def test_year_claim_is_not_matched_to_a_quarterly_value(revenue):
+    verdict = check_numeric_claim(_claim("2024 Revenue", "$25.7 Billion"), revenue)
+    assert verdict["verdict"] == REFUTED
+    assert verdict["actual"] == pytest.approx(97.69e9)
+
+
+def test_exact_periods_still_support(revenue):
+    assert check_numeric_claim(_claim("Q4 2024 Revenue", "$25.7 Billion"), revenue)["verdict"] == SUPPORTED
+    assert check_numeric_claim(_claim("2024 Revenue", "$97.7 Billion"), revenue)["verdict"] == SUPPORTED
+
+
+def test_claim_is_checked_against_its_own_line_item():
+    health = MetricResult("TSLA", "financial_health", [
+        MetricValue("Total Cash", 36.56e9, "USD", "2025-09-30", "mrq"),
+        MetricValue("Total Debt", 13.62e9, "USD", "2025-09-30", "mrq"),
+        MetricValue("Cash per Share", 11.3, "USD", "2025-10-20", "mrq"),
+    ])
+    verdict = check_numeric_claim(_claim("Total debt", "$36.6 Billion"), health)
+    assert verdict["verdict"] == REFUTED
+    assert "Total Debt" in verdict["reason"]
+
+
+def test_trailing_pe_is_not_matched_to_forward_pe():
+    pe = MetricResult("TSLA", "pe_ratio", [
+        MetricValue("Trailing P/E", 180.5, "ratio", "2025-10-20", "ttm"),
+        MetricValue("Forward P/E", 31.0, "ratio", "2025-10-20", "forward"),
+    ])
+    verdict = check_numeric_claim(_claim("Trailing P/E ratio", "31"), pe)
+    assert verdict["verdict"] == REFUTED
+    assert "Trailing P/E" in verdict["reason"]
+
+
+@pytest.fixture
+def apple_prices(monkeypatch):
+    """AAPL bars for March and December 2023 in the local price store."""
+    from src.tools import price_store
+    from src.tools.price_store import BAR_DTYPE, PriceSeries
+
+    rows = [("2023-03-01", 146.8, 147.2, 145.0, 145.3), ("2023-03-31", 162.4, 165.0, 161.9, 164.9),
+            ("2023-12-28", 194.1, 194.7, 193.2, 193.6), ("2023-12-29", 193.9, 194.4, 191.7, 192.53),
+            ("2024-01-02", 187.2, 188.4, 183.9, 185.6)]
+    bars = np.array([(np.datetime64(day), o, h, l, c, 1e6) for day, o, h, l, c in rows], dtype=BAR_DTYPE)
+    monkeypatch.setattr(price_store, "load_prices", lambda ticker, refresh=True: PriceSeries(ticker, bars))
+    return MetricResult("AAPL", "historical_price", [
+        MetricValue("Year-End Close", 192.53, "USD", "2023-12-29", "year_end")], source="mock")
+
+
+@pytest.mark.parametrize("claimed_value, expected", [("$165", REFUTED), ("$250", REFUTED), ("$255", REFUTED),
+                                                     ("$192.50", SUPPORTED)])
+def test_year_claims_are_judged_against_the_year_end_close(apple_prices, claimed_value, expected):
+    claim = {"target": "Apple", "ticker": "AAPL", "attribute": "Stock price at end of 2023",
+             "claimed_value": claimed_value}
+    assert check_numeric_claim(claim, apple_prices, "2023")["verdict"] == expected
+
+
+@pytest.mark.parametrize("claimed_value, expected", [("$146", SUPPORTED), ("$190", SUPPORTED), ("$250", REFUTED)])
+def test_bare_year_claims_are_judged_against_the_traded_range(apple_prices, claimed_value, expected):
+    claim = {"target": "Apple", "ticker": "AAPL", "attribute": "Stock price", "claimed_value": claimed_value}
+    assert check_numeric_claim(claim, apple_prices, "2023")["verdict"] == expected
+
+
+def test_month_claims_must_fall_inside_the_reported_range(apple_prices):
+    claim = {"target": "Apple", "ticker": "AAPL", "attribute": "Stock price", "claimed_value": "$150"}
+    assert check_numeric_claim(claim, apple_prices, "March 2023")["verdict"] == SUPPORTED
+    claim["claimed_value"] = "$166"
+    assert check_numeric_claim(claim, apple_prices, "March 2023")["verdict"] != SUPPORTED
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Tesla revenue rose 5% in Q3 2025", True),
+    ("Tesla revenue fell 5% in Q3 2025", False),
+    ("Tesla revenue rose 5% in Q3 2024", False),
+    ("Tesla revenue rose 5% in Q2 2025", False),
+])
+def test_snippets_state_a_change_only_with_its_direction_and_period(text, expected):
+    claimed = parse_claimed_value("+5%")
+    assert states_value(text, claimed, parse_timeframe("2025-Q3")) is expected
+
+
+def test_snippets_state_an_amount_only_in_its_unit():
+    claimed = parse_claimed_value("$25 billion")
+    assert states_value("Deliveries reached 25 billion units", claimed) is False
+    assert states_value("Revenue reached $25 billion", claimed) is True
+
+
+@pytest.mark.parametrize("claimed_value, expected", [
+    ("more than $4 trillion", REFUTED),
+    ("under $3.7 trillion", REFUTED),
+    ("over $3.5 trillion", SUPPORTED),
+    ("less than $4 trillion", SUPPORTED),
+    ("over $3.86 trillion", INCONCLUSIVE),
+])
+def test_bound_claims_are_decided_by_the_side_of_the_bound(claimed_value, expected):
+    market_cap = MetricResult("AAPL", "market_cap", [
+        MetricValue("Market Cap", 3.85e12, "USD", "2025-10-20", "current")], source="mock")
+    verdict = check_numeric_claim(_claim("Market Cap", claimed_value), market_cap)
+    assert verdict["verdict"] == expected
+
+
+NET_INCOME = MetricResult("RIVN", "net_income", [
+    MetricValue("Annual Net Income", -4.75e9, "USD", "2024-12-31", "FY")], source="mock")
+
+
+@pytest.mark.parametrize("attribute, claimed_value", [("2024 Net Loss", "$4.75 billion"),
+                                                      ("2024 Net Income", "a loss of $4.75 billion")])
+def test_losses_are_negative_income(attribute, claimed_value):
+    assert check_numeric_claim(_claim(attribute, claimed_value), NET_INCOME)["verdict"] == SUPPORTED
+
+
+def test_sign_mismatch_alone_is_left_to_the_semantic_verifier():
+    assert check_numeric_claim(_claim("2024 Net Income", "$4.75 billion"), NET_INCOME) is None
+
+
+def test_ambiguous_line_item_is_left_to_the_semantic_verifier():
+    pe = MetricResult("NVDA", "pe_ratio", [
+        MetricValue("Trailing P/E", 52.0, "ratio", "2025-10-20", "ttm"),
+        MetricValue("Forward P/E", 30.0, "ratio", "2025-10-20", "forward"),
+    ])
+    assert check_numeric_claim(_claim("P/E", "30"), pe) is None
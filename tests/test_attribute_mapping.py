@@ -0,0 +1,31 @@
+import pytest
+
+from src.tools import yfinance_tool
+from src.tools.yfinance_tool import RULE_CONFIDENCE_THRESHOLD, _normalize_attribute, _rule_based_key
+
+
+@pytest.fixture
+def no_llm(monkeypatch):
+    """Maps with the local tiers only; an LLM fallback shows up as "llm"."""
+    monkeypatch.setattr(yfinance_tool, "_llm_map_attribute", lambda text: "llm")
+    monkeypatch.setattr(yfinance_tool, "_LLM_MAPPING_CACHE", {})
+
+
+@pytest.mark.parametrize("attribute, expected", [
+    ("Q3 2025 Revenue growth", "total_revenue"),
+    ("2024 Revenue", "total_revenue"),
+    ("Net Income", "net_income"),
+    ("Total debt", "financial_health"),
+    ("Trailing P/E Ratio", "pe_ratio"),
+    ("Price in 2022", "historical_price"),
+    ("Year-End Stock Price", "price"),
+])
+def test_fully_matched_phrases_stay_local(no_llm, attribute, expected):
+    assert yfinance_tool.map_attribute_to_metric_key(attribute) == expected
+
+
+@pytest.mark.parametrize("attribute", ["Operating income", "Free cash flow"])
+def test_partly_matched_phrases_are_not_confident(no_llm, attribute):
+    _, confidence = _rule_based_key(_normalize_attribute(attribute))
+    assert confidence < RULE_CONFIDENCE_THRESHOLD
+    assert yfinance_tool.map_attribute_to_metric_key(attribute) == "llm"
@@ -0,0 +1,33 @@
+import json
+
+from src.batch import completed_ids, compact_output
+
+
+def _write(path, records, tail=""):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + tail, encoding="utf-8")
+
+
+def test_last_record_per_id_wins(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _write(output, [{"id": "1", "claims": []},
+                    {"id": "2", "error": "down", "error_kind": "transient"},
+                    {"id": "3", "error": "down", "error_kind": "transient"},
+                    {"id": "3", "claims": []}])
+    assert completed_ids(str(output)) == {"1", "3"}
+
+
+def test_partial_last_line_is_cut_off(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _write(output, [{"id": "1", "claims": []}], tail='{"id": "2", "cla')
+    assert completed_ids(str(output)) == {"1"}
+    assert output.read_text(encoding="utf-8").endswith("\n")
+
+
+def test_compact_output_drops_superseded_records(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _write(output, [{"id": "1", "claims": []},
+                    {"id": "2", "error": "down", "error_kind": "transient"},
+                    {"id": "2", "claims": []}])
+    compact_output(str(output))
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [(r["id"], "error" in r) for r in records] == [("1", False), ("2", False)]
@@ -0,0 +1,61 @@
+import pytest
+
+from src.agents import semantic
+from src.claim_index import canonical_claim
+
+
+class FakeIndex:
+    """Every stored entry is a near-perfect match for every query."""
+
+    def __init__(self):
+        self.entries = {"claim": [], "snippet": []}
+
+    def add(self, entries):
+        for text, kind, _, _, meta in entries:
+            self.entries[kind].append({"text": text, **meta})
+
+    def search(self, vector, kind, limit):
+        return [(0.99, entry) for entry in self.entries[kind]]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FakeIndex()
+    monkeypatch.setattr(semantic, "_index", lambda: index)
+    monkeypatch.setattr(semantic, "embed_texts", lambda texts: [[1.0]] * len(texts))
+    return index
+
+
+CLAIM = {"target": "Tesla", "ticker": "TSLA", "attribute": "Q3 2025 Revenue growth", "claimed_value": "+5%",
+         "inferred_timeframe": "2025-Q3"}
+
+
+def _web(snippet):
+    return {"results": [{"snippet": snippet, "url": "https://example.com", "score": 0.9}]}
+
+
+def test_matching_snippet_supports_a_claim_without_db_evidence(index):
+    verdict, _, _ = semantic.check_against_index(CLAIM, _web("Tesla Q3 2025 revenue rose 5% year over year"))
+    assert verdict["verdict"] == "SUPPORTED"
+
+
+def test_snippet_with_the_opposite_direction_does_not_support(index):
+    verdict, _, _ = semantic.check_against_index(CLAIM, _web("Tesla Q3 2025 revenue fell 5% year over year"))
+    assert verdict is None
+
+
+def test_snippets_never_decide_claims_with_db_evidence(index):
+    verdict, _, _ = semantic.check_against_index(CLAIM, _web("Tesla Q3 2025 revenue rose 5% year over year"),
+                                                 db_evidence="Quarterly Revenue QoQ: [2025-09-30: -2.1%]")
+    assert verdict is None
+
+
+def test_known_claim_about_another_metric_is_not_reused(index):
+    revenue = {"target": "Tesla", "ticker": "TSLA", "attribute": "Q3 Revenue", "claimed_value": "$25 billion",
+               "inferred_timeframe": "2025-Q3"}
+    net_income = {**revenue, "attribute": "Q3 Net Income"}
+    verdict = {"verdict": "SUPPORTED", "confidence": 0.9}
+    semantic.remember_verdict(revenue, canonical_claim(revenue), verdict, [1.0])
+
+    assert semantic.check_against_index(revenue, None, db_evidence="db")[0]["verdict"] == "SUPPORTED"
+    assert semantic.check_against_index(net_income, None, db_evidence="db")[0] is None
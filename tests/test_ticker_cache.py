@@ -0,0 +1,57 @@
+import threading
+
+from src.tools.ticker_cache import TickerSnapshot
+
+
+class SlowStock:
+    """`info` blocks until released; every endpoint counts its fetches."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.fetches = {"info": 0, "fast_info": 0}
+
+    @property
+    def info(self):
+        self.fetches["info"] += 1
+        self.release.wait(5)
+        return {"trailingPE": 30.0}
+
+    @property
+    def fast_info(self):
+        self.fetches["fast_info"] += 1
+        return {"last_price": 250.0}
+
+
+def _snapshot():
+    snapshot = TickerSnapshot("TSLA")
+    snapshot._stock = SlowStock()
+    return snapshot
+
+
+def _in_thread(func):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", func()))
+    thread.start()
+    return thread, result
+
+
+def test_a_slow_endpoint_does_not_block_the_others():
+    snapshot = _snapshot()
+    thread, _ = _in_thread(lambda: snapshot.get("info"))
+    try:
+        assert snapshot.fast("last_price") == 250.0     # returns while info is still downloading
+        assert snapshot.fast("last_price") == 250.0
+    finally:
+        snapshot._stock.release.set()
+        thread.join()
+    assert snapshot._stock.fetches == {"info": 1, "fast_info": 1}
+
+
+def test_concurrent_callers_of_one_endpoint_share_its_fetch():
+    snapshot = _snapshot()
+    threads = [_in_thread(lambda: snapshot.get("info")) for _ in range(4)]
+    snapshot._stock.release.set()
+    for thread, _ in threads:
+        thread.join()
+    assert [result["value"] for _, result in threads] == [{"trailingPE": 30.0}] * 4
+    assert snapshot._stock.fetches["info"] == 1
@@ -0,0 +1,47 @@
+import json
+import multiprocessing as mp
+
+import numpy as np
+
+from src.tools import vector_index
+from src.tools.vector_index import VectorIndex
+
+
+def _vector(i, dim=8):
+    vector = np.zeros(dim, dtype="f4")
+    vector[i % dim] = 1.0
+    vector[(i + 1) % dim] = 0.5
+    return vector
+
+
+def _add_many(directory, worker, batches, per_batch):
+    index = VectorIndex(directory)
+    for batch in range(batches):
+        index.add([(f"{worker}-{batch}-{i}", "snippet", 3600, _vector(i), {}) for i in range(per_batch)])
+
+
+def test_concurrent_processes_lose_no_rows(tmp_path):
+    processes = [mp.get_context("fork").Process(target=_add_many, args=(str(tmp_path), worker, 10, 3))
+                 for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    assert len(VectorIndex(str(tmp_path))) == 4 * 10 * 3
+
+
+def test_compaction_drops_expired_rows_and_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "MAX_SHARDS", 2)
+    index = VectorIndex(str(tmp_path))
+    index.add([("stale claim", "claim", -1, _vector(0), {"verdict": "SUPPORTED"})])
+    for i in range(2):   # the third shard goes past MAX_SHARDS
+        index.add([(f"fresh claim {i}", "claim", 3600, _vector(i + 1), {"verdict": "REFUTED"})])
+
+    assert sorted(path.name for path in tmp_path.glob("*.npy")) == ["vectors.npy"]
+    entries = [json.loads(line)["text"] for line in (tmp_path / "entries.jsonl").read_text().splitlines()]
+    assert entries == ["fresh claim 0", "fresh claim 1"]
+
+    reader = VectorIndex(str(tmp_path))
+    assert len(reader) == 2
+    assert [entry["text"] for _, entry in reader.search(_vector(1), "claim", k=1)] == ["fresh claim 0"]
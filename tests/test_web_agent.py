@@ -0,0 +1,12 @@
+from src.agents.web_agent import build_claim_queries
+
+
+def test_private_companies_with_placeholder_tickers_are_searched_separately():
+    claims = [
+        {"target": "OpenAI", "ticker": "null", "attribute": "Revenue"},
+        {"target": "SpaceX", "ticker": "N/A", "attribute": "Valuation"},
+        {"target": "Tesla", "ticker": "TSLA", "attribute": "Q3 Revenue"},
+        {"target": "Tesla Inc", "ticker": "TSLA", "attribute": "CEO"},
+    ]
+    assert build_claim_queries(claims) == {"OpenAI Revenue": [0], "SpaceX Valuation": [1],
+                                           "Tesla Q3 Revenue, CEO": [2, 3]}